@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import UserRegisters
+from .models import UserRegisters, OutboundEmail, RevokedToken
 
 # Register your models here.
-admin.site.register(UserRegisters)
\ No newline at end of file
+admin.site.register(UserRegisters)
+admin.site.register(OutboundEmail)
+admin.site.register(RevokedToken)
\ No newline at end of file
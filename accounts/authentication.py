@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+
+class ClaimsUser(TokenUser):
+    """
+    Request user built from access token claims alone. `profile_id` falls
+    back to one query for tokens issued before the profile existed.
+    """
+
+    @cached_property
+    def id(self):
+        # simplejwt stores the user id claim as a string; compare like a DB id
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def profile_id(self):
+        profile_id= self.token.get('profile_id')
+        if profile_id is None:
+            from profiles.models import Profile
+            profile_id= Profile.objects.filter(user_id=self.id).values_list('id', flat=True).first()
+        return profile_id
+
+    @cached_property
+    def slug(self):
+        return self.token.get('slug')
+
+    @cached_property
+    def is_verified(self):
+        return self.token.get('is_verified', False)
+
+
+class ValidatedTokenCache:
+    """
+    LRU of raw access token -> validated token, so a client reusing its
+    token skips the signature check. Entries are dropped once the token
+    expires.
+    """
+
+    def __init__(self, size=4096):
+        self.size= size
+        self._tokens= OrderedDict()
+        self._lock= threading.Lock()
+
+    def get(self, raw_token):
+        with self._lock:
+            token= self._tokens.get(raw_token)
+            if token is None:
+                return None
+
+            if token['exp'] <= time.time():
+                del self._tokens[raw_token]
+                return None
+
+            self._tokens.move_to_end(raw_token)
+            return token
+
+    def put(self, raw_token, token):
+        with self._lock:
+            self._tokens[raw_token]= token
+            self._tokens.move_to_end(raw_token)
+            if len(self._tokens) > self.size:
+                self._tokens.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tokens.clear()
+
+
+token_cache= ValidatedTokenCache(getattr(settings, 'AUTH_TOKEN_CACHE_SIZE', 4096))
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Stateless JWT authentication: request.user is a ClaimsUser and no user
+    row is loaded. A deactivated user keeps access until their current
+    access token expires (ACCESS_TOKEN_LIFETIME).
+    """
+
+    def get_validated_token(self, raw_token):
+        key= raw_token.decode() if isinstance(raw_token, bytes) else raw_token
+
+        token= token_cache.get(key)
+        if token is None:
+            token= super().get_validated_token(raw_token)
+            token_cache.put(key, token)
+
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        return ClaimsUser(validated_token)
+
+
+"""Schema"""
+from drf_spectacular.contrib.rest_framework_simplejwt import SimpleJWTScheme
+
+
+class ClaimsJWTScheme(SimpleJWTScheme):
+    target_class= 'accounts.authentication.ClaimsJWTAuthentication'
+    name= 'jwtClaimsAuth'
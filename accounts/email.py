@@ -1,28 +1,22 @@
-from django.core.mail import send_mail
+import secrets
 
-from django.conf import settings
+from django.db import transaction
 
 from .models import UserRegisters
+from .mailqueue import enqueue
 
-import random
-def send_otp_email_via(email):
-    try:
-        otp= random.randint(100000, 999999)
-        subject= 'your verification mail'
-        message= f'Your otp {otp}'
-
-        email_form= settings.EMAIL_HOST_USER
-        send_mail(subject, message, email_form, [email])
 
-        try:
-            user= UserRegisters.objects.get(email=email)
-            user.otp= otp
+def send_otp_email_via(email):
+    """
+    Store a fresh OTP on the user and queue the mail; the request never
+    waits on SMTP. Returns the queued OutboundEmail, or None for an unknown
+    email.
+    """
+    otp= f'{secrets.randbelow(900000) + 100000}'
 
-            user.save()
-        except user.DoesNotExist():
+    with transaction.atomic():
+        if not UserRegisters.objects.filter(email=email).update(otp=otp):
             print(f"your email {email} does't exits")
+            return None
 
-        
-    except Exception as e:
-        print(f"Error sending otp {otp}")
-        return None
\ No newline at end of file
+        return enqueue(email, 'your verification mail', f'Your otp {otp}')
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class ConfiguredPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from
+    PASSWORD_PBKDF2_ITERATIONS.
+
+    The algorithm name is unchanged, so existing hashes still verify, and
+    Django's check_password re-hashes a password at its next successful login
+    whenever the stored count differs from the configured one (or the
+    preferred hasher is a different algorithm).
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', PBKDF2PasswordHasher.iterations)
@@ -0,0 +1,177 @@
+"""
+Durable outbound mail queue on the OutboundEmail table.
+
+`enqueue` only inserts a row, so a request never waits on SMTP. Workers
+claim due rows in batches with one conditional UPDATE (so concurrent workers,
+threads or processes, never get the same row), send the whole batch over a
+single backend connection, and reschedule failures with exponential backoff.
+
+Workers run as a small in-process thread pool woken after each enqueue
+(MAIL_QUEUE_IN_PROCESS) and/or as `python manage.py run_mail_worker`.
+"""
+import logging
+import random
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+
+logger= logging.getLogger(__name__)
+
+
+def enqueue(to, subject, body):
+    from .models import OutboundEmail
+
+    job= OutboundEmail.objects.create(to=to, subject=subject, body=body)
+    transaction.on_commit(pool.wake)
+    return job
+
+
+def backoff(attempts):
+    """Seconds before retry number `attempts`: base * 2^(n-1), +-20% jitter."""
+    delay= getattr(settings, 'MAIL_RETRY_BASE_SECONDS', 30) * 2 ** (attempts - 1)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim(batch_size):
+    """
+    Claim up to `batch_size` due jobs and return them. Rows stuck in
+    SENDING longer than MAIL_CLAIM_TIMEOUT_SECONDS (a dead worker) are due
+    again.
+    """
+    from .models import OutboundEmail
+
+    now= timezone.now()
+    stale= now - timedelta(seconds=getattr(settings, 'MAIL_CLAIM_TIMEOUT_SECONDS', 300))
+    due= (
+        Q(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+        | Q(status=OutboundEmail.SENDING, claimed_at__lt=stale)
+    )
+
+    ids= list(OutboundEmail.objects.filter(due).order_by('next_attempt_at', 'id').values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    token= uuid.uuid4().hex
+    # Re-checking `due` makes the UPDATE the arbiter between competing workers
+    OutboundEmail.objects.filter(due, pk__in=ids).update(
+        status=OutboundEmail.SENDING, claim_token=token, claimed_at=now
+    )
+    return list(OutboundEmail.objects.filter(claim_token=token, status=OutboundEmail.SENDING))
+
+
+def _failed(job, error):
+    from .models import OutboundEmail
+
+    job.attempts+= 1
+    job.last_error= str(error)
+    if job.attempts >= getattr(settings, 'MAIL_MAX_ATTEMPTS', 5):
+        job.status= OutboundEmail.FAILED
+    else:
+        job.status= OutboundEmail.PENDING
+        job.next_attempt_at= timezone.now() + timedelta(seconds=backoff(job.attempts))
+
+    job.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_batch(jobs):
+    """Send claimed jobs over one connection. Returns the number sent."""
+    from .models import OutboundEmail
+
+    sent= 0
+    from_email= settings.EMAIL_HOST_USER or settings.DEFAULT_FROM_EMAIL
+    connection= get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        for job in jobs:
+            _failed(job, e)
+        return 0
+
+    try:
+        for job in jobs:
+            try:
+                EmailMessage(job.subject, job.body, from_email, [job.to], connection=connection).send()
+            except Exception as e:
+                _failed(job, e)
+                continue
+
+            job.status= OutboundEmail.SENT
+            job.sent_at= timezone.now()
+            job.save(update_fields=['status', 'sent_at'])
+            sent+= 1
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    return sent
+
+
+def drain(batch_size=None):
+    """Send due jobs batch by batch until none are left. Returns the number sent."""
+    batch_size= batch_size or getattr(settings, 'MAIL_BATCH_SIZE', 50)
+    sent= 0
+    while True:
+        jobs= claim(batch_size)
+        if not jobs:
+            return sent
+        sent+= send_batch(jobs)
+
+
+class MailWorkerPool:
+    """
+    `workers` daemon threads that drain the queue whenever woken, and every
+    `poll_interval` seconds so retries come due without a new enqueue.
+    Threads start on the first wake().
+    """
+
+    def __init__(self, workers=2, poll_interval=30):
+        self.workers= workers
+        self.poll_interval= poll_interval
+
+        self._event= threading.Event()
+        self._lock= threading.Lock()
+        self._threads= []
+
+    def wake(self):
+        if not getattr(settings, 'MAIL_QUEUE_IN_PROCESS', True):
+            return
+
+        self._ensure_threads()
+        self._event.set()
+
+    def _ensure_threads(self):
+        if self._threads:
+            return
+
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread= threading.Thread(target=self._run, name=f'mail-worker-{i}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            self._event.wait(self.poll_interval)
+            self._event.clear()
+            try:
+                close_old_connections()
+                drain()
+            except Exception:
+                logger.exception("mail queue drain failed")
+
+
+pool= MailWorkerPool(
+    workers= getattr(settings, 'MAIL_WORKERS', 2),
+    poll_interval= getattr(settings, 'MAIL_POLL_SECONDS', 30),
+)
@@ -0,0 +1,46 @@
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from accounts.models import UserRegisters
+from accounts.serializers import LoginSerializer
+from profiles.benchmark import make_users, measure, rolled_back
+
+
+PASSWORD= 'bench-password-123'
+
+
+class Command(BaseCommand):
+    help= "Measure login throughput (single thread, i.e. per core) of the old double-authenticate path and the current one"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20, help="Logins per run")
+
+    def handle(self, *args, **options):
+        count= options['count']
+        request= RequestFactory().post('/account/login/')
+
+        with rolled_back():
+            users= make_users(count)
+            UserRegisters.objects.filter(pk__in=[user.pk for user in users]).update(password=make_password(PASSWORD))
+            emails= [user.email for user in users]
+
+            for label, fn in [('validate + authenticate', self.legacy), ('validated_data user', self.single)]:
+                _, seconds, queries, _= measure(fn, emails, request)
+                self.stdout.write(
+                    f"{label:<24} {count} logins  {seconds:8.3f}s  {count / seconds:8.1f} logins/s/core  "
+                    f"{queries / count:5.1f} queries/login"
+                )
+
+    def legacy(self, emails, request):
+        for email in emails:
+            serializer= LoginSerializer(data={'email': email, 'password': PASSWORD}, context={'request': request})
+            serializer.is_valid(raise_exception=True)
+            authenticate(request, email=email, password=PASSWORD)
+
+    def single(self, emails, request):
+        for email in emails:
+            serializer= LoginSerializer(data={'email': email, 'password': PASSWORD}, context={'request': request})
+            serializer.is_valid(raise_exception=True)
+            serializer.validated_data['user']
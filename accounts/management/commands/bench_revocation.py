@@ -0,0 +1,46 @@
+import uuid
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from accounts.models import RevokedToken
+from accounts.revocation import RevocationList
+from profiles.benchmark import measure, rolled_back
+
+
+class Command(BaseCommand):
+    help= "Compare the revocation filter with a database lookup for tokens that were never revoked (all writes are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--revoked', type=int, default=100000, help="Revoked tokens to seed")
+        parser.add_argument('--lookups', type=int, default=10000, help="Lookups of never-revoked JTIs per run")
+
+    def handle(self, *args, **options):
+        revoked, lookups= options['revoked'], options['lookups']
+
+        with rolled_back():
+            expires_at= timezone.now() + timedelta(days=1)
+            RevokedToken.objects.bulk_create(
+                [RevokedToken(jti=uuid.uuid4().hex, expires_at=expires_at) for _ in range(revoked)],
+                batch_size=5000,
+            )
+
+            revocations= RevocationList(capacity=revoked)
+            _, seconds, _, _= measure(revocations.rebuild)
+            self.stdout.write(f"filter build      {revoked} revoked  {seconds:8.3f}s  {len(revocations.filter.bits) / 2**10:8.1f} KiB")
+
+            jtis= [uuid.uuid4().hex for _ in range(lookups)]
+            runs= [
+                ('database exists()', lambda: [RevokedToken.objects.filter(jti=jti).exists() for jti in jtis]),
+                ('RevocationList', lambda: [revocations.is_revoked(jti) for jti in jtis]),
+            ]
+            for label, fn in runs:
+                _, seconds, queries, _= measure(fn)
+                self.stdout.write(
+                    f"{label:<17} {lookups} lookups  {seconds / lookups * 1e6:8.1f} us/lookup  "
+                    f"{queries / lookups:6.4f} queries/lookup"
+                )
+
+            false_positives= sum(jti in revocations.filter for jti in jtis)
+            self.stdout.write(f"false positive rate: {false_positives / lookups:.4%} (target {revocations.error_rate:.2%})")
@@ -0,0 +1,157 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from accounts.models import UserRegisters
+from profiles.models import Profile
+
+
+PROFILE_FIELDS= ('first_name', 'last_name', 'bio', 'phone', 'address')
+
+
+def _init_worker():
+    # Needed when the pool spawns instead of forks (macOS / Windows)
+    import django
+    django.setup()
+
+
+def _hash(password):
+    return make_password(password or None)
+
+
+class Command(BaseCommand):
+    help= "Import users (and their profiles) from a CSV or NDJSON file, resumable from a checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help="Defaults to the file extension")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Password hashing processes")
+        parser.add_argument('--checkpoint', help="Defaults to <path>.checkpoint")
+        parser.add_argument('--prehashed', action='store_true', help="`password` already holds Django password hashes")
+        parser.add_argument('--verified', action='store_true', help="Mark imported users as verified")
+
+    def handle(self, *args, **options):
+        path= options['path']
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist")
+
+        fmt= options['format'] or ('csv' if path.endswith('.csv') else 'ndjson')
+        checkpoint= options['checkpoint'] or f'{path}.checkpoint'
+        chunk_size= options['chunk_size']
+
+        done= self.read_checkpoint(checkpoint)
+        if done:
+            self.stdout.write(f"resuming after row {done}")
+
+        started= time.perf_counter()
+        imported= skipped= 0
+
+        pool= None
+        if not options['prehashed'] and options['workers'] > 1:
+            pool= ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker)
+
+        try:
+            with open(path, newline='', encoding='utf-8') as f:
+                rows= self.read_rows(f, fmt)
+                rows= islice(rows, done, None)
+
+                while True:
+                    chunk= list(islice(rows, chunk_size))
+                    if not chunk:
+                        break
+
+                    created= self.import_chunk(chunk, pool, options)
+                    imported+= created
+                    skipped+= len(chunk) - created
+                    done+= len(chunk)
+                    self.write_checkpoint(checkpoint, done)
+
+                    elapsed= time.perf_counter() - started
+                    self.stdout.write(
+                        f"{done} rows read, {imported} imported, {skipped} skipped, "
+                        f"{imported / elapsed:.0f} rows/s"
+                    )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        elapsed= time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"imported {imported} users in {elapsed:.1f}s ({imported / elapsed if elapsed else 0:.0f} rows/s), "
+            f"skipped {skipped}"
+        ))
+
+    def read_rows(self, f, fmt):
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+            return
+
+        for line in f:
+            line= line.strip()
+            if line:
+                yield json.loads(line)
+
+    def read_checkpoint(self, checkpoint):
+        try:
+            with open(checkpoint) as f:
+                return int(json.load(f)['rows'])
+        except FileNotFoundError:
+            return 0
+        except (ValueError, KeyError):
+            raise CommandError(f"unreadable checkpoint {checkpoint}")
+
+    def write_checkpoint(self, checkpoint, rows):
+        tmp= f'{checkpoint}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'rows': rows}, f)
+        os.replace(tmp, checkpoint)
+
+    def import_chunk(self, chunk, pool, options):
+        records= {}
+        for row in chunk:
+            email= UserRegisters.objects.normalize_email((row.get('email') or '').strip())
+            if email and email not in records:
+                records[email]= row
+
+        # A crash between commit and checkpoint can replay a chunk; existing emails are skipped
+        existing= set(UserRegisters.objects.filter(email__in=records.keys()).values_list('email', flat=True))
+        records= {email: row for email, row in records.items() if email not in existing}
+        if not records:
+            return 0
+
+        passwords= [row.get('password') for row in records.values()]
+        if options['prehashed']:
+            hashes= [password or make_password(None) for password in passwords]
+        elif pool is not None:
+            hashes= list(pool.map(_hash, passwords, chunksize=max(1, len(passwords) // (4 * options['workers']))))
+        else:
+            hashes= [_hash(password) for password in passwords]
+
+        users= [
+            UserRegisters(
+                email=email,
+                password=password_hash,
+                is_verified=options['verified'] or str(row.get('is_verified', '')).lower() in ('1', 'true', 'yes'),
+            )
+            for (email, row), password_hash in zip(records.items(), hashes)
+        ]
+
+        with transaction.atomic():
+            users= UserRegisters.objects.bulk_create(users, batch_size=options['chunk_size'])
+
+            profiles= [
+                Profile(user=user, **{field: row.get(field) or None for field in PROFILE_FIELDS})
+                for user, row in zip(users, records.values())
+                if any(row.get(field) for field in PROFILE_FIELDS)
+            ]
+            Profile.objects.bulk_create_profiles(profiles, batch_size=options['chunk_size'])
+
+        return len(users)
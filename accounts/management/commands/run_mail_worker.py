@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.mailqueue import drain
+
+
+class Command(BaseCommand):
+    help= "Drain the outbound mail queue; runs until interrupted unless --once is given"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Send everything that is due, then exit")
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'MAIL_BATCH_SIZE', 50))
+        parser.add_argument('--poll-interval', type=float, default=getattr(settings, 'MAIL_POLL_SECONDS', 30))
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            sent= drain(options['batch_size'])
+            if sent:
+                self.stdout.write(f"sent {sent} emails")
+
+            if options['once']:
+                return
+            time.sleep(options['poll_interval'])
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from .manager import Managers
 # Create your models here.
@@ -16,4 +17,59 @@ class UserRegisters(AbstractUser):
     objects= Managers()
 
     def __str__(self):
-        return self.email
\ No newline at end of file
+        return self.email
+
+class OutboundEmail(models.Model):
+    """
+    Durable mail queue. Rows are claimed in batches by accounts.mailqueue
+    workers and retried with exponential backoff until MAIL_MAX_ATTEMPTS.
+    """
+    PENDING= 'pending'
+    SENDING= 'sending'
+    SENT= 'sent'
+    FAILED= 'failed'
+
+    STATUS_CHOICES= [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    to= models.EmailField(max_length=100)
+    subject= models.CharField(max_length=200)
+    body= models.TextField()
+
+    status= models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts= models.PositiveSmallIntegerField(default=0)
+    next_attempt_at= models.DateTimeField(default=timezone.now)
+    claim_token= models.CharField(max_length=32, blank=True, default='')
+    claimed_at= models.DateTimeField(blank=True, null=True)
+    last_error= models.TextField(blank=True, default='')
+
+    created_at= models.DateTimeField(auto_now_add=True)
+    sent_at= models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes= [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.to} {self.subject} ({self.status})"
+
+
+class RevokedToken(models.Model):
+    """
+    JTIs of refresh tokens that may no longer be used: rotated away on
+    refresh or explicitly revoked. The unique jti makes a second rotation of
+    the same token fail, which is how reuse is detected. Rows are purged
+    once the token would have expired anyway.
+    """
+    jti= models.CharField(max_length=64, unique=True)
+    user= models.ForeignKey('UserRegisters', related_name='revoked_tokens', on_delete=models.CASCADE, blank=True, null=True)
+    expires_at= models.DateTimeField(db_index=True)
+    revoked_at= models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.jti
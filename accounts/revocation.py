@@ -0,0 +1,157 @@
+"""
+Refresh token revocation.
+
+RevokedToken is the source of truth. Each process keeps a Bloom filter of
+the revoked JTIs, so the common case (a token that was never revoked) is
+answered in memory. Only a possible hit goes to the database. The filter
+picks up rows written by other processes every REVOCATION_SYNC_SECONDS, and
+is rebuilt from scratch (dropping expired JTIs) every
+REVOCATION_REBUILD_SECONDS.
+
+A lagging filter can only miss a revocation, never invent one, and rotation
+does not rely on it: revoking the old JTI is a unique INSERT, so a token
+that was already rotated or revoked is refused by the database.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from userprofile.background import BackgroundTask
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings; k probes from one blake2b digest."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity= max(1, capacity)
+        self.size= max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes= max(1, round(self.size / capacity * math.log(2)))
+        self.bits= bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest= hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1= int.from_bytes(digest[:8], 'little')
+        h2= int.from_bytes(digest[8:], 'little') | 1
+        size= self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, item):
+        bits= self.bits
+        for position in self._positions(item):
+            bits[position >> 3]|= 1 << (position & 7)
+
+    def __contains__(self, item):
+        bits= self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+def _expires_at(token):
+    return datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+
+
+class RevocationList:
+    def __init__(self, capacity=100000, error_rate=0.001, sync_interval=5, rebuild_interval=3600):
+        self.capacity= capacity
+        self.error_rate= error_rate
+        self.sync_interval= sync_interval
+        self.rebuild_interval= rebuild_interval
+
+        self.filter= None
+        self.last_id= 0
+        self.synced_at= 0.0
+        self.built_at= 0.0
+        self._lock= threading.Lock()
+        self._rebuilder= BackgroundTask('revocation-rebuild', self.rebuild)
+
+    def rebuild(self):
+        """Purge expired rows and load the rest into a fresh filter."""
+        from .models import RevokedToken
+
+        RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+
+        rows= RevokedToken.objects.order_by('id').values_list('id', 'jti')
+        count= rows.count()
+        bloom= BloomFilter(max(self.capacity, 2 * count), self.error_rate)
+
+        last_id= 0
+        for pk, jti in rows.iterator(chunk_size=5000):
+            bloom.add(jti)
+            last_id= pk
+
+        with self._lock:
+            self.filter= bloom
+            # Rows committed after the read above are picked up by the next sync()
+            self.last_id= last_id
+            self.synced_at= self.built_at= time.monotonic()
+
+    def sync(self):
+        """Add rows written since the last sync, e.g. by other processes."""
+        from .models import RevokedToken
+
+        new= list(RevokedToken.objects.filter(id__gt=self.last_id).order_by('id').values_list('id', 'jti'))
+        with self._lock:
+            for pk, jti in new:
+                self.filter.add(jti)
+                self.last_id= max(self.last_id, pk)
+            self.synced_at= time.monotonic()
+
+    def _fresh_filter(self):
+        if self.filter is None:
+            with self._lock:
+                needs_build= self.filter is None
+            if needs_build:
+                self.rebuild()
+            return self.filter
+
+        now= time.monotonic()
+        rebuilding= now - self.built_at > self.rebuild_interval and self._rebuilder.start()
+        if not rebuilding and now - self.synced_at > self.sync_interval:
+            self.sync()
+
+        return self.filter
+
+    def is_revoked(self, jti):
+        if jti not in self._fresh_filter():
+            return False
+
+        from .models import RevokedToken
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+    def revoke(self, token):
+        """
+        Revoke a validated refresh token. Returns False when it was already
+        revoked (for rotation: the token is being reused).
+        """
+        from .models import RevokedToken
+        from rest_framework_simplejwt.settings import api_settings
+
+        jti= token[api_settings.JTI_CLAIM]
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(
+                    jti=jti, user_id=token.get(api_settings.USER_ID_CLAIM), expires_at=_expires_at(token)
+                )
+        except IntegrityError:
+            return False
+
+        bloom= self._fresh_filter()
+        with self._lock:
+            bloom.add(jti)
+        return True
+
+
+revocations= RevocationList(
+    capacity= getattr(settings, 'REVOCATION_FILTER_CAPACITY', 100000),
+    error_rate= getattr(settings, 'REVOCATION_FILTER_ERROR_RATE', 0.001),
+    sync_interval= getattr(settings, 'REVOCATION_SYNC_SECONDS', 5),
+    rebuild_interval= getattr(settings, 'REVOCATION_REBUILD_SECONDS', 3600),
+)
@@ -26,7 +26,8 @@ class LoginSerializer(serializers.Serializer):
         email= data.get('email')
         password= data.get('password')
 
-        user= authenticate(email=email, password=password)
+        # The view reuses data['user']; this is the only password check of a login
+        user= authenticate(self.context.get('request'), email=email, password=password)
 
 
         if not user:
@@ -1,3 +1,255 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from profiles.models import Profile
+from . import mailqueue
+from .authentication import ClaimsUser
+from .models import UserRegisters, OutboundEmail
+from .revocation import revocations
+from .throttling import TokenBucketThrottle
+from .tokens import ProfileRefreshToken
+
+def make_user(i):
+    return UserRegisters.objects.create_user(email=f'user{i}@example.com', password=None, is_verified=True)
+
+
+class RefreshRotationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        revocations.filter= None
+        self.client= APIClient()
+        self.refresh_token= str(ProfileRefreshToken.for_user(make_user(0)))
+
+    def refresh(self, token):
+        return self.client.post('/account/token/refresh/', {'refresh_token': token}, format='json').data
+
+    def test_refresh_rotates_token(self):
+        data= self.refresh(self.refresh_token)
+        self.assertEqual(data['status'], 200)
+        self.assertIn('access_token', data)
+        self.assertNotEqual(data['refresh_token'], self.refresh_token)
+
+        self.assertEqual(self.refresh(data['refresh_token'])['status'], 200)
+
+    def test_reused_refresh_token_is_refused(self):
+        self.assertEqual(self.refresh(self.refresh_token)['status'], 200)
+        self.assertEqual(self.refresh(self.refresh_token)['status'], 402)
+
+    def test_revoked_refresh_token_is_refused(self):
+        data= self.client.post('/account/token/revoke/', {'refresh_token': self.refresh_token}, format='json').data
+        self.assertEqual(data['status'], 200)
+        self.assertEqual(self.refresh(self.refresh_token)['status'], 402)
+
+    def test_revoke_ignores_basic_auth_header(self):
+        with self.assertNumQueries(0):
+            response= self.client.post('/account/token/revoke/', {}, format='json', HTTP_AUTHORIZATION='Basic dXNlcjpwYXNz')
+        self.assertEqual(response.data['status'], 400)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+@mock.patch.object(TokenBucketThrottle, 'THROTTLE_RATES', {'login_ip': '100/min', 'login_email': '3/min', 'refresh_ip': '2/min'})
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client= APIClient()
+
+    def login(self, email, **extra):
+        return self.client.post('/account/login/', {'email': email, 'password': 'wrong'}, format='json', **extra)
+
+    def test_email_bucket_returns_429_with_retry_after(self):
+        codes= [self.login('someone@example.com').status_code for _ in range(4)]
+        self.assertEqual(codes, [200, 200, 200, 429])
+
+        response= self.login(' SomeOne@Example.com')
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 20)
+
+        self.assertEqual(self.login('other@example.com').status_code, 200)
+
+    def test_ip_bucket_ignores_forwarded_for(self):
+        codes= [
+            self.client.post('/account/token/refresh/', {}, format='json', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code
+            for i in range(3)
+        ]
+        self.assertEqual(codes, [200, 200, 429])
+
+    def test_bucket_refills(self):
+        for _ in range(2):
+            self.client.post('/account/token/refresh/', {}, format='json')
+
+        later= mock.patch('accounts.throttling.time.time', return_value=time.time() + 31)
+        with later:
+            self.assertEqual(self.client.post('/account/token/refresh/', {}, format='json').status_code, 200)
+            self.assertEqual(self.client.post('/account/token/refresh/', {}, format='json').status_code, 429)
+
+    def test_scope_without_rate_is_not_throttled(self):
+        for _ in range(5):
+            response= self.client.post('/account/token/revoke/', {}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class ImportUsersTests(TestCase):
+    def setUp(self):
+        directory= tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path= os.path.join(directory, 'users.csv')
+        with open(self.path, 'w') as f:
+            f.write('email,password,first_name,last_name\n')
+            f.write('ann@example.com,secret-1,Ann,Lee\n')
+            f.write('bob@example.com,secret-2,,\n')
+            f.write('ann@example.com,other,Ann,Again\n')
+            f.write('cy@example.com,secret-3,Cy,Dee\n')
+
+    def run_import(self, *args):
+        call_command('import_users', self.path, '--workers=1', '--chunk-size=2', *args, stdout=StringIO())
+
+    def test_import(self):
+        self.run_import('--verified')
+
+        self.assertEqual(
+            sorted(UserRegisters.objects.values_list('email', flat=True)),
+            ['ann@example.com', 'bob@example.com', 'cy@example.com'],
+        )
+        self.assertEqual(authenticate(email='ann@example.com', password='secret-1').profile.slug, 'ann-lee')
+        self.assertFalse(hasattr(UserRegisters.objects.get(email='bob@example.com'), 'profile'))
+
+    def test_resume_from_checkpoint(self):
+        with open(f'{self.path}.checkpoint', 'w') as f:
+            json.dump({'rows': 2}, f)
+        self.run_import()
+
+        self.assertEqual(list(UserRegisters.objects.order_by('email').values_list('email', flat=True)), ['ann@example.com', 'cy@example.com'])
+        self.assertEqual(UserRegisters.objects.get(email='ann@example.com').profile.last_name, 'Again')
+
+    def test_rerun_skips_existing_users(self):
+        self.run_import()
+        os.remove(f'{self.path}.checkpoint')
+        self.run_import()
+        self.assertEqual(UserRegisters.objects.count(), 3)
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class MailQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_register_queues_otp_without_sending(self):
+        with mock.patch.object(mailqueue.pool, 'wake') as wake, self.captureOnCommitCallbacks(execute=True):
+            response= APIClient().post('/account/register/', {'email': 'new@example.com', 'password': 'password123'}, format='json')
+        self.assertEqual(response.data['status'], 200)
+        wake.assert_called_once()
+        self.assertEqual(mail.outbox, [])
+
+        otp= UserRegisters.objects.get(email='new@example.com').otp
+        self.assertEqual(len(otp), 6)
+        self.assertIn(otp, OutboundEmail.objects.get().body)
+
+    def test_drain_sends_batch_over_one_connection(self):
+        for i in range(3):
+            mailqueue.enqueue(f'user{i}@example.com', 'Subject', 'Body')
+
+        with mock.patch.object(EmailBackend, 'open', autospec=True, side_effect=EmailBackend.open) as opened:
+            self.assertEqual(mailqueue.drain(batch_size=10), 3)
+        self.assertEqual(opened.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.SENT).count(), 3)
+
+    def test_failed_send_is_retried_later(self):
+        job= mailqueue.enqueue('user@example.com', 'Subject', 'Body')
+        with mock.patch.object(EmailBackend, 'send_messages', side_effect=OSError('boom')):
+            self.assertEqual(mailqueue.drain(), 0)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (OutboundEmail.PENDING, 1))
+        self.assertIn('boom', job.last_error)
+        self.assertEqual(mailqueue.drain(), 0)
+
+        OutboundEmail.objects.filter(pk=job.pk).update(next_attempt_at=job.created_at)
+        self.assertEqual(mailqueue.drain(), 1)
+
+    def test_worker_logs_drain_failures(self):
+        class Stop(BaseException):
+            pass
+
+        worker= mailqueue.MailWorkerPool()
+        with mock.patch.object(worker._event, 'wait', side_effect=[True, Stop]), \
+                mock.patch.object(mailqueue, 'close_old_connections'), \
+                mock.patch.object(mailqueue, 'drain', side_effect=OSError('smtp down')), \
+                self.assertLogs('accounts.mailqueue', 'ERROR') as logs, \
+                self.assertRaises(Stop):
+            worker._run()
+        self.assertIn('smtp down', logs.output[0])
+
+    def test_claims_never_overlap(self):
+        for i in range(5):
+            mailqueue.enqueue(f'user{i}@example.com', 'Subject', 'Body')
+        first, second= mailqueue.claim(3), mailqueue.claim(3)
+        self.assertEqual(len(first) + len(second), 5)
+        self.assertFalse({job.pk for job in first} & {job.pk for job in second})
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class LoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user= UserRegisters.objects.create_user(email='user@example.com', password='password123', is_verified=True)
+        self.client= APIClient()
+
+    def login(self, password='password123'):
+        return self.client.post('/account/login/', {'email': 'user@example.com', 'password': password}, format='json').data
+
+    def test_password_is_checked_once(self):
+        with mock.patch.object(PBKDF2PasswordHasher, 'verify', autospec=True, side_effect=PBKDF2PasswordHasher.verify) as verify:
+            data= self.login()
+        self.assertEqual(data['status'], 200)
+        self.assertEqual(verify.call_count, 1)
+
+    def test_hash_upgraded_to_configured_iterations(self):
+        self.assertIn('$1000$', self.user.password)
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.login()
+        self.user.refresh_from_db()
+        self.assertIn('$2000$', self.user.password)
+
+    def test_wrong_password(self):
+        self.assertEqual(self.login('wrong')['status'], 400)
+
+
+class ProfileClaimsTests(TestCase):
+    def setUp(self):
+        self.user= make_user(0)
+        self.profile= Profile.objects.create(user=self.user, first_name='Ann', last_name='Lee')
+
+    def test_token_carries_profile_claims(self):
+        token= ProfileRefreshToken.for_user(self.user)
+        self.assertEqual((token['profile_id'], token['slug'], token['is_verified']), (self.profile.id, 'ann-lee', True))
+
+        user= ClaimsUser(token.access_token)
+        self.assertEqual((user.id, user.pk), (self.user.id, self.user.id))
+        with self.assertNumQueries(0):
+            self.assertEqual(user.profile_id, self.profile.id)
+
+    def test_refresh_picks_up_new_profile(self):
+        user= make_user(1)
+        token= ProfileRefreshToken.for_user(user)
+        self.assertIsNone(token['profile_id'])
+
+        profile= Profile.objects.create(user=user, first_name='Cy', last_name='Dee')
+        data= APIClient().post('/account/token/refresh/', {'refresh_token': str(token)}, format='json').data
+        self.assertEqual(AccessToken(data['access_token'])['profile_id'], profile.id)
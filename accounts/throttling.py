@@ -0,0 +1,126 @@
+"""
+Token-bucket throttles for the unauthenticated account endpoints.
+
+Each bucket is one integer in the cache: its theoretical arrival time (TAT)
+in milliseconds, as in GCRA. A rate of N/period is a bucket of N tokens that
+refills one token every period/N. Taking a token is a single atomic incr()
+of the TAT by that interval; the request is allowed while the TAT stays
+within one full bucket of now. Refill is lazy: an idle bucket's TAT is
+simply in the past, and is reset to now on the next request. A rejected
+request gives its token back, so a client hammering a throttled endpoint
+does not push its own wait further out.
+
+Rates live in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] (see
+AUTH_THROTTLE_RATES). Client addresses come from REMOTE_ADDR, or from
+X-Forwarded-For only as far as REST_FRAMEWORK['NUM_PROXIES'] trusted
+proxies reach, so a client cannot pick its own bucket. Buckets are shared
+between processes only if THROTTLE_CACHE points at a shared backend with
+atomic incr (Redis, Memcached); the default locmem cache limits per process.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Bucket per `get_ident()` under the scope `<view.throttle_scope>_<bucket>`.
+    Like DRF's ScopedRateThrottle the rate depends on the view, so it is
+    looked up per request; views without a throttle_scope, or scopes without
+    a rate, are not throttled.
+    """
+
+    bucket= None
+    cache= caches[getattr(settings, 'THROTTLE_CACHE', 'default')]
+    cache_format= 'throttle_%(scope)s_%(ident)s'
+
+    def __init__(self):
+        pass
+
+    def get_rate(self):
+        return self.THROTTLE_RATES.get(self.scope)
+
+    def identify(self, request):
+        # Hashed: cache keys must not contain arbitrary client input
+        return hashlib.sha1(self.get_ident(request).encode()).hexdigest()
+
+    def get_cache_key(self, request, view):
+        ident= self.identify(request)
+        if ident is None:
+            return None
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def allow_request(self, request, view):
+        view_scope= getattr(view, 'throttle_scope', None)
+        if not view_scope:
+            return True
+
+        self.scope= f'{view_scope}_{self.bucket}'
+        self.rate= self.get_rate()
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration= self.parse_rate(self.rate)
+
+        self.key= self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        interval= self.duration * 1000 // self.num_requests
+        burst= interval * self.num_requests
+        # Outlives any TAT the bucket can reach; refreshed below while the
+        # bucket is under pressure
+        timeout= 2 * self.duration + 1
+
+        now= int(time.time() * 1000)
+        self.cache.add(self.key, now, timeout)
+        try:
+            tat= self.cache.incr(self.key, interval)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(self.key, now + interval, timeout)
+            return True
+
+        if tat - interval < now:
+            # Idle bucket, full again. Concurrent resets can only drop tokens
+            # taken by requests that are allowed anyway.
+            self.cache.set(self.key, now + interval, timeout)
+            return True
+
+        if tat - now <= burst:
+            if tat - now > burst // 2:
+                self.cache.touch(self.key, timeout)
+            return True
+
+        try:
+            self.cache.decr(self.key, interval)
+        except ValueError:
+            pass
+        self.cache.touch(self.key, timeout)
+        self.wait_ms= tat - burst - now
+        return False
+
+    def wait(self):
+        return max(1, math.ceil(self.wait_ms / 1000))
+
+
+class IPThrottle(TokenBucketThrottle):
+    bucket= 'ip'
+
+
+class EmailThrottle(TokenBucketThrottle):
+    """Bucket per (case-insensitive) `email` in the request body."""
+
+    bucket= 'email'
+
+    def identify(self, request):
+        try:
+            email= request.data.get('email')
+        except Exception:
+            return None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return hashlib.sha1(email.strip().lower().encode()).hexdigest()
@@ -0,0 +1,32 @@
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class ProfileRefreshToken(RefreshToken):
+    """
+    Refresh token carrying `profile_id`, `slug` and `is_verified` claims.
+    The access tokens minted from it copy them, so ClaimsJWTAuthentication
+    can serve requests without loading the user or profile rows.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token= super().for_user(user)
+        token.set_profile_claims(user.pk, user.is_verified)
+        return token
+
+    def set_profile_claims(self, user_id, is_verified):
+        from profiles.models import Profile
+
+        profile_id, slug= Profile.objects.filter(user_id=user_id).values_list('id', 'slug').first() or (None, None)
+        self['profile_id']= profile_id
+        self['slug']= slug
+        self['is_verified']= is_verified
+
+    def refresh_profile_claims(self):
+        """Re-read the claims, e.g. the profile was created or renamed since login."""
+        from .models import UserRegisters
+
+        user_id= self[api_settings.USER_ID_CLAIM]
+        is_verified= UserRegisters.objects.filter(pk=user_id).values_list('is_verified', flat=True).first()
+        self.set_profile_claims(user_id, bool(is_verified))
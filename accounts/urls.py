@@ -1,12 +1,13 @@
 from django.urls import path 
 
 
-from .views import RegisterView, LoginView, EmailVerifyView, CustomRefreshTokenView
+from .views import RegisterView, LoginView, EmailVerifyView, CustomRefreshTokenView, RevokeTokenView
 
 urlpatterns = [
     path('register/', RegisterView.as_view()),
     path('login/', LoginView.as_view()),
     path('verify/', EmailVerifyView.as_view()),
     path('token/refresh/', CustomRefreshTokenView.as_view(), name='custom_refresh'),
+    path('token/revoke/', RevokeTokenView.as_view(), name='revoke_token'),
 
 ]
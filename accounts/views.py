@@ -1,15 +1,16 @@
 from django.shortcuts import render
-from django.contrib.auth import authenticate
 
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 
 from .serializers import LoginSerializer, RegisterSerializer, OTPSerializer
 from .models import UserRegisters
 from .email import send_otp_email_via
+from .tokens import ProfileRefreshToken
+from .revocation import revocations
+from .throttling import IPThrottle, EmailThrottle
 
 """Schema"""
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse, OpenApiExample, OpenApiTypes
@@ -23,7 +24,8 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiRespon
     responses={
         200: OpenApiResponse(description="OTP sent successfully"),
         400: OpenApiResponse(description="Validation error or user already exists"),
-        500: OpenApiResponse(description="Server error")
+        500: OpenApiResponse(description="Server error"),
+        429: OpenApiResponse(description="Too many requests, see Retry-After"),
     },
     examples=[
         OpenApiExample(
@@ -37,6 +39,11 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiRespon
     ]
 )
 class RegisterView(APIView):
+    # No authenticators: throttling must run before any password hashing
+    authentication_classes= []
+    throttle_classes= [IPThrottle, EmailThrottle]
+    throttle_scope= 'register'
+
     def post(self, request):
         try:
             serializer= RegisterSerializer  (data= request.data)
@@ -88,27 +95,21 @@ class RegisterView(APIView):
         ),
         400: OpenApiResponse(description="Validation error"),
         404: OpenApiResponse(description="Email or password incorrect"),
-        500: OpenApiResponse(description="Server error")
+        500: OpenApiResponse(description="Server error"),
+        429: OpenApiResponse(description="Too many requests, see Retry-After"),
     }
 )
 class LoginView(APIView):
+    authentication_classes= []
+    throttle_classes= [IPThrottle, EmailThrottle]
+    throttle_scope= 'login'
+
     def post(self, request):
         try:
-            serializer= LoginSerializer(data= request.data)
+            serializer= LoginSerializer(data= request.data, context={'request': request})
             
             if serializer.is_valid():
-                email= serializer.validated_data.get('email')
-                password= serializer.validated_data.get('password')
-
-
-                user= authenticate(request, email=email, password=password)
-
-                if user is None:
-                    return Response({
-                        'status': 404,
-                        'message': 'Email or Password Not Correct',
-                        'errors': serializer.errors
-                    })
+                user= serializer.validated_data['user']
                 
                 if not user.is_verified:
                     return Response({
@@ -116,7 +117,7 @@ class LoginView(APIView):
                         'message': 'your account is not verified. please verified your email'
                     })
                 
-                refresh_token= RefreshToken.for_user(user)
+                refresh_token= ProfileRefreshToken.for_user(user)
 
 
                 return Response({
@@ -149,7 +150,8 @@ class LoginView(APIView):
     responses={
         200: OpenApiResponse(description="Email verified successfully"),
         400: OpenApiResponse(description="Invalid email or wrong OTP"),
-        500: OpenApiResponse(description="Server error")
+        500: OpenApiResponse(description="Server error"),
+        429: OpenApiResponse(description="Too many requests, see Retry-After"),
     },
     examples=[
         OpenApiExample(
@@ -160,6 +162,10 @@ class LoginView(APIView):
     ]
 )
 class EmailVerifyView(APIView):
+    authentication_classes= []
+    throttle_classes= [IPThrottle, EmailThrottle]
+    throttle_scope= 'verify'
+
     def post(self, request):
         try:
 
@@ -208,16 +214,18 @@ class EmailVerifyView(APIView):
 
 @extend_schema(
     summary="Refresh JWT Access Token",
-    description="Generate a new access token using the refresh token.",
+    description="Generate a new access token using the refresh token. The refresh token is rotated: "
+                "use the returned `refresh_token` next time, the one sent is revoked.",
     request=OpenApiTypes.OBJECT,
     parameters=[
         OpenApiParameter(name="refresh_token", type=str, description="Refresh token in request body or header 'refresh-token'")
     ],
     responses={
-        200: OpenApiResponse(description="New access token generated"),
+        200: OpenApiResponse(description="New access and refresh token generated"),
         400: OpenApiResponse(description="Refresh token is required"),
-        402: OpenApiResponse(description="Invalid refresh token"),
-        500: OpenApiResponse(description="Server error")
+        402: OpenApiResponse(description="Invalid, revoked or already used refresh token"),
+        500: OpenApiResponse(description="Server error"),
+        429: OpenApiResponse(description="Too many requests, see Retry-After"),
     },
     examples=[
         OpenApiExample(
@@ -228,6 +236,10 @@ class EmailVerifyView(APIView):
     ]
 )
 class CustomRefreshTokenView(APIView):
+    authentication_classes= []
+    throttle_classes= [IPThrottle]
+    throttle_scope= 'refresh'
+
     def post(self, request):
         try:
             body_token= request.data.get('refresh_token')
@@ -243,20 +255,36 @@ class CustomRefreshTokenView(APIView):
         
          
             try:
-                refresh= RefreshToken(refresh_token)
+                refresh= ProfileRefreshToken(refresh_token)
 
             except TokenError:
                 return Response({
                     'status': 402,
                     'message': 'Invalid refresh token'
                 })
-            
+
+            # The in-memory filter turns away revoked tokens without a query;
+            # revoke() is the authoritative check, a second use of the same
+            # token loses on the unique jti
+            if revocations.is_revoked(refresh['jti']) or not revocations.revoke(refresh):
+                return Response({
+                    'status': 402,
+                    'message': 'Refresh token has been revoked'
+                })
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+
+            # The profile may have been created or renamed since login
+            refresh.refresh_profile_claims()
             new_access_token= refresh.access_token
 
             return Response({
                 'status': 200,
                 'message': 'New Access Token generated',
-                'access_token': str(new_access_token)
+                'access_token': str(new_access_token),
+                'refresh_token': str(refresh)
             })
         except Exception as e:
             return Response({
@@ -264,4 +292,49 @@ class CustomRefreshTokenView(APIView):
                 'message': 'something went wrong!',
                 'errors': str(e)
             })
-    
+
+
+@extend_schema(
+    summary="Revoke a refresh token",
+    description="Log out a session: the refresh token can no longer be used. Access tokens already issued stay valid until they expire.",
+    request=OpenApiTypes.OBJECT,
+    responses={
+        200: OpenApiResponse(description="Refresh token revoked"),
+        400: OpenApiResponse(description="Refresh token is required"),
+        402: OpenApiResponse(description="Invalid refresh token"),
+        429: OpenApiResponse(description="Too many requests, see Retry-After"),
+    },
+    examples=[
+        OpenApiExample(
+            "Revoke Token Example",
+            value={"refresh_token": "string"},
+            request_only=True
+        )
+    ]
+)
+class RevokeTokenView(APIView):
+    authentication_classes= []
+    throttle_classes= [IPThrottle]
+    throttle_scope= 'revoke'
+
+    def post(self, request):
+        refresh_token= request.data.get('refresh_token') or request.headers.get('refresh-token')
+        if refresh_token is None:
+            return Response({
+                'status': 400,
+                'message': 'Refresh Token is required!'
+            })
+
+        try:
+            refresh= ProfileRefreshToken(refresh_token)
+        except TokenError:
+            return Response({
+                'status': 402,
+                'message': 'Invalid refresh token'
+            })
+
+        revocations.revoke(refresh)
+        return Response({
+            'status': 200,
+            'message': 'Refresh token revoked'
+        })
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Profile
+from .models import Profile, DataExport
 
 # Register your models here.
-admin.site.register(Profile)
\ No newline at end of file
+admin.site.register(Profile)
+admin.site.register(DataExport)
@@ -0,0 +1,164 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+
+from django.conf import settings
+
+from userprofile.background import BackgroundTask
+
+
+class PrefixIndex:
+    """
+    In-memory typeahead index over profile slug, first name and last name of
+    public profiles.
+
+    `entries` is a sorted list of (term, profile_id) so every prefix maps to
+    one contiguous slice found with two bisects. Matches are ranked by
+    (followers_count, last_active_at). Recent answers are memoised per prefix
+    because a typeahead box asks for the same short prefixes over and over;
+    any write clears the memo.
+    """
+
+    MEMO_SIZE= 2048
+
+    def __init__(self):
+        self.entries= []
+        self.profiles= {}
+        self.built_at= None
+        self._memo= OrderedDict()
+        self._lock= threading.Lock()
+
+    @staticmethod
+    def terms_for(slug, first_name, last_name):
+        terms= {slug.casefold()} if slug else set()
+        for name in (first_name, last_name):
+            if name:
+                terms.add(name.casefold())
+        return terms
+
+    @staticmethod
+    def weight_for(followers_count, last_active_at):
+        return (followers_count or 0, last_active_at.timestamp() if last_active_at else 0.0)
+
+    def _add(self, pk, slug, first_name, last_name, followers_count, last_active_at):
+        terms= self.terms_for(slug, first_name, last_name)
+        self.profiles[pk]= (slug, first_name, last_name, self.weight_for(followers_count, last_active_at), terms)
+        for term in terms:
+            insort(self.entries, (term, pk))
+
+    def _remove(self, pk):
+        old= self.profiles.pop(pk, None)
+        if old is None:
+            return
+
+        for term in old[4]:
+            i= bisect_left(self.entries, (term, pk))
+            if i < len(self.entries) and self.entries[i] == (term, pk):
+                del self.entries[i]
+
+    def load(self, rows):
+        """Replace the whole index from (id, slug, first, last, followers_count, last_active_at) rows."""
+        profiles= {}
+        entries= []
+        for pk, slug, first_name, last_name, followers_count, last_active_at in rows:
+            terms= self.terms_for(slug, first_name, last_name)
+            profiles[pk]= (slug, first_name, last_name, self.weight_for(followers_count, last_active_at), terms)
+            entries.extend((term, pk) for term in terms)
+        entries.sort()
+
+        with self._lock:
+            self.profiles= profiles
+            self.entries= entries
+            self._memo.clear()
+            self.built_at= time.monotonic()
+
+    def update(self, profile):
+        with self._lock:
+            self._remove(profile.pk)
+            if not profile.is_private:
+                self._add(
+                    profile.pk, profile.slug, profile.first_name, profile.last_name,
+                    profile.followers_count, profile.last_active_at,
+                )
+            self._memo.clear()
+
+    def remove(self, pk):
+        with self._lock:
+            self._remove(pk)
+            self._memo.clear()
+
+    def complete(self, prefix, limit=10):
+        prefix= prefix.casefold().strip()
+        if not prefix:
+            return []
+
+        key= (prefix, limit)
+        with self._lock:
+            if key in self._memo:
+                self._memo.move_to_end(key)
+                return self._memo[key]
+
+            lo= bisect_left(self.entries, (prefix,))
+            hi= bisect_left(self.entries, (prefix + '\U0010ffff',), lo)
+
+            matched= {pk for term, pk in self.entries[lo:hi]}
+            best= heapq.nlargest(limit, matched, key=lambda pk: (self.profiles[pk][3], -pk))
+            result= [
+                {'slug': self.profiles[pk][0], 'first_name': self.profiles[pk][1], 'last_name': self.profiles[pk][2]}
+                for pk in best
+            ]
+
+            self._memo[key]= result
+            if len(self._memo) > self.MEMO_SIZE:
+                self._memo.popitem(last=False)
+
+        return result
+
+
+index= PrefixIndex()
+_build_lock= threading.Lock()
+
+
+def _rows():
+    from .models import Profile
+
+    return Profile.objects.filter(is_private=False).values_list(
+        'id', 'slug', 'first_name', 'last_name', 'followers_count', 'last_active_at'
+    ).iterator(chunk_size=5000)
+
+
+def _build_first():
+    with _build_lock:
+        if index.built_at is None:
+            index.load(_rows())
+
+
+_warmup= BackgroundTask('autocomplete-warmup', _build_first)
+_refresher= BackgroundTask('autocomplete-refresh', lambda: index.load(_rows()))
+
+
+def warm():
+    """Start building the index in the background (called at startup)."""
+    if index.built_at is None:
+        _warmup.start()
+
+
+def get_index():
+    """
+    The index is fully built once per process, by warm() at startup or else
+    inline on first use (a request during the warm-up build waits for it),
+    then kept current by the Profile signal handlers. Follower counts move
+    without a Profile save, so it is also rebuilt in the background every
+    AUTOCOMPLETE_REFRESH_SECONDS to refresh the weights.
+    """
+    if index.built_at is None:
+        _build_first()
+        return index
+
+    max_age= getattr(settings, 'AUTOCOMPLETE_REFRESH_SECONDS', 600)
+    if time.monotonic() - index.built_at > max_age:
+        _refresher.start()
+
+    return index
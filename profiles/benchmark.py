@@ -0,0 +1,59 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+
+"""Helpers for the bench_* management commands. Nothing here runs in requests."""
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def measure(fn, *args, trace_memory=False, **kwargs):
+    """Call `fn` once. Returns (result, seconds, queries, peak_bytes or None)."""
+    queries= 0
+
+    def count(execute, sql, params, many, context):
+        nonlocal queries
+        queries+= 1
+        return execute(sql, params, many, context)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    with connection.execute_wrapper(count):
+        started= time.perf_counter()
+        result= fn(*args, **kwargs)
+        elapsed= time.perf_counter() - started
+
+    peak= None
+    if trace_memory:
+        peak= tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result, elapsed, queries, peak
+
+
+def make_users(count, prefix='bench'):
+    """Bulk-create throwaway users (unusable passwords) and return them with ids."""
+    from accounts.models import UserRegisters
+
+    stamp= time.time_ns()
+    return UserRegisters.objects.bulk_create([
+        UserRegisters(email=f'{prefix}-{stamp}-{i}@bench.invalid', password='!', is_verified=True)
+        for i in range(count)
+    ], batch_size=1000)
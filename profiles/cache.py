@@ -0,0 +1,135 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+"""Versioned keys: bumping a version orphans every entry built under the old one"""
+
+def _version_key(namespace, pk):
+    return f'{namespace}:ver:{pk}'
+
+
+def _version(namespace, pk):
+    key= _version_key(namespace, pk)
+    version= cache.get(key)
+    if version is None:
+        version= time.time_ns()
+        if not cache.add(key, version, None):
+            version= cache.get(key, version)
+
+    return version
+
+
+def _bump(namespace, pks):
+    version= time.time_ns()
+    cache.set_many({_version_key(namespace, pk): version for pk in pks}, None)
+
+
+def get_or_build(key, build, timeout):
+    """
+    Read-through with stampede protection: when a hot key is missing only the
+    caller that wins `cache.add` on the lock rebuilds it, the rest wait briefly
+    for its result before falling back to building themselves.
+    """
+    value= cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key= f'{key}:lock'
+    if cache.add(lock_key, 1, getattr(settings, 'PROFILE_CACHE_LOCK_SECONDS', 5)):
+        try:
+            value= build()
+            if value is not None:
+                cache.set(key, value, timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    for _ in range(20):
+        time.sleep(0.025)
+        value= cache.get(key)
+        if value is not None:
+            return value
+
+    return build()
+
+
+"""Relationship status (am I following / do they follow me) per viewer"""
+
+def relationship_version(profile_id):
+    return _version('relationship', profile_id)
+
+
+def bump_relationship_versions(profile_ids):
+    """Drop every cached relationship entry of these viewers in O(1) each."""
+    _bump('relationship', profile_ids)
+
+
+def get_relationships(viewer_id, slugs):
+    version= relationship_version(viewer_id)
+    keys= {f'relationship:{viewer_id}:{version}:{slug}': slug for slug in slugs}
+
+    found= cache.get_many(keys.keys())
+    return version, {keys[key]: value for key, value in found.items()}
+
+
+def set_relationships(viewer_id, version, states):
+    cache.set_many(
+        {f'relationship:{viewer_id}:{version}:{slug}': state for slug, state in states.items()},
+        getattr(settings, 'RELATIONSHIP_CACHE_SECONDS', 30),
+    )
+
+
+"""Profile detail payloads and slug -> id resolution"""
+
+def _slug_key(slug):
+    return f'profile:slug:{slug}'
+
+
+def bump_profile_versions(profile_ids):
+    _bump('profile', profile_ids)
+
+
+def forget_slug(slug):
+    cache.delete(_slug_key(slug))
+
+
+def resolve_slug(slug):
+    """Profile id for a slug, or None. Cached; a missing slug is not cached."""
+    from .models import Profile
+
+    key= _slug_key(slug)
+    pk= cache.get(key)
+    if pk is None:
+        pk= Profile.objects.filter(slug=slug).values_list('id', flat=True).first()
+        if pk is not None:
+            cache.set(key, pk, getattr(settings, 'PROFILE_CACHE_SECONDS', 300))
+
+    return pk
+
+
+def profile_entry(pk):
+    """
+    {'user_id', 'is_private', 'last_active_at', 'updated_at', 'data'} for a
+    profile, where `data` is the ProfileSerializer payload. None when the
+    profile is gone.
+    """
+    from .models import Profile
+    from .serializers import ProfileSerializer
+
+    def build():
+        profile= Profile.objects.filter(pk=pk).first()
+        if profile is None:
+            return None
+
+        return {
+            'user_id': profile.user_id,
+            'is_private': profile.is_private,
+            'last_active_at': profile.last_active_at,
+            'updated_at': profile.updated_at,
+            'data': dict(ProfileSerializer(profile).data),
+        }
+
+    key= f'profile:data:{pk}:{_version("profile", pk)}'
+    return get_or_build(key, build, getattr(settings, 'PROFILE_CACHE_SECONDS', 300))
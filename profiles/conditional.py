@@ -0,0 +1,124 @@
+"""
+Conditional GET for the profile endpoints.
+
+Each endpoint has a validator that runs one cheap query (or reads the
+cached profile entry the view itself serves) and returns
+(parts, last_modified), or None to skip conditional handling (missing or
+private profile). The parts are hashed with the viewer and the full path
+into a strong ETag, so a matching If-None-Match, or a fresh
+If-Modified-Since, is answered with a 304 before any serializer runs.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .serializers import last_seen_human
+
+
+def make_etag(request, parts):
+    source= '|'.join(str(part) for part in (request.user.id, request.get_full_path(), *parts))
+    return quote_etag(hashlib.sha1(source.encode()).hexdigest())
+
+
+def conditional(validator):
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            validated= validator(request, *args, **kwargs)
+            if validated is None:
+                return method(self, request, *args, **kwargs)
+
+            parts, last_modified= validated
+            etag= make_etag(request, parts)
+            timestamp= int(last_modified.timestamp()) if last_modified else None
+
+            response= get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response= method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response.headers['ETag']= etag
+            if timestamp is not None:
+                response.headers['Last-Modified']= http_date(timestamp)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
+
+
+def _latest(*times):
+    times= [t for t in times if t is not None]
+    return max(times) if times else None
+
+
+def _profile_parts(row):
+    updated_at, last_active_at, followers_count, following_count= row
+    # last_seen_human is relative to now, so its rendered text is part of the tag
+    parts= (updated_at.isoformat(), last_active_at, followers_count, following_count, last_seen_human(last_active_at))
+    return parts, _latest(updated_at, last_active_at)
+
+
+PROFILE_VALIDATOR_FIELDS= ('updated_at', 'last_active_at', 'followers_count', 'following_count')
+
+
+def own_profile_validator(request):
+    from .models import Profile
+
+    row= Profile.objects.filter(user_id=request.user.id).values_list(*PROFILE_VALIDATOR_FIELDS).first()
+    if row is None:
+        return None
+    return _profile_parts(row)
+
+
+def profile_validator(request, slug):
+    """
+    The detail view answers from the cached profile entry, which can lag the
+    database, so the tag is taken from that same entry rather than the row.
+    """
+    from .cache import resolve_slug, profile_entry
+
+    pk= resolve_slug(slug)
+    entry= profile_entry(pk) if pk is not None else None
+    if entry is None or entry['data']['slug'] != slug:
+        return None
+    if entry['is_private'] and entry['user_id'] != request.user.id:
+        return None
+
+    data= json.dumps(entry['data'], sort_keys=True, cls=DjangoJSONEncoder)
+    last_active_at= entry['last_active_at']
+    parts= (data, last_seen_human(last_active_at))
+    return parts, _latest(entry.get('updated_at'), last_active_at)
+
+
+def _follow_list_validator(slug, column, count_field):
+    """
+    The newest Follow.created_at (one probe of the (profile, created_at)
+    index) together with the denormalized counter identifies the list. An
+    unfollow leaves the newest follow alone but moves the counter and
+    updated_at, so Last-Modified is the later of the two.
+    """
+    from .models import Profile, Follow
+
+    latest= Follow.objects.filter(**{column: OuterRef('pk')}).order_by('-created_at').values('created_at')[:1]
+    row= Profile.objects.filter(slug=slug).annotate(latest_follow=Subquery(latest)).values_list(
+        count_field, 'latest_follow', 'updated_at'
+    ).first()
+    if row is None:
+        return None
+
+    count, latest_follow, updated_at= row
+    return (count, latest_follow, updated_at.isoformat()), _latest(updated_at, latest_follow)
+
+
+def followers_validator(request, slug):
+    return _follow_list_validator(slug, 'following', 'followers_count')
+
+
+def following_validator(request, slug):
+    return _follow_list_validator(slug, 'follower', 'following_count')
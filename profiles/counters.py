@@ -0,0 +1,32 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def _count_subquery(model, column):
+    counted= model.objects.filter(
+        **{column: OuterRef('pk')}
+    ).order_by().values(column).annotate(c=Count('pk')).values('c')
+
+    return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+
+def followers_subquery(follow_model=None):
+    from .models import Follow
+    return _count_subquery(follow_model or Follow, 'following')
+
+
+def following_subquery(follow_model=None):
+    from .models import Follow
+    return _count_subquery(follow_model or Follow, 'follower')
+
+
+def recount(profile_ids):
+    """Set both counters of the given profiles from Follow in one UPDATE."""
+    from .models import Profile
+
+    return Profile.objects.filter(pk__in=profile_ids).update(
+        followers_count= followers_subquery(),
+        following_count= following_subquery(),
+        updated_at= timezone.now(),
+    )
@@ -0,0 +1,125 @@
+"""
+Per-user data export archives.
+
+`start_export` hands the job to a small thread pool once the request's
+transaction commits. The worker writes a zip to a temporary file section by
+section: account and profile as JSON, followers and followings streamed from
+chunked querysets as NDJSON, and the profile image copied from storage in
+blocks. No section is ever held in memory as a whole.
+
+Jobs live only in the process that queued them, so an export still pending or
+running after DATA_EXPORT_TIMEOUT_SECONDS is assumed lost and `expire_stale`
+marks it failed.
+"""
+import os
+import shutil
+import tempfile
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections, transaction
+from django.utils import timezone
+
+from .export import blocks, ndjson_lines
+
+
+ACCOUNT_FIELDS= ('id', 'email', 'is_verified', 'is_active', 'date_joined', 'last_login')
+PROFILE_FIELDS= (
+    'slug', 'first_name', 'last_name', 'bio', 'phone', 'address', 'is_private', 'profile_img',
+    'link1_name', 'link1_url', 'link2_name', 'link2_url', 'link3_name', 'link3_url',
+    'followers_count', 'following_count', 'last_active_at',
+)
+FOLLOW_FIELDS= ('slug', 'first_name', 'last_name', 'followed_at')
+
+_executor= ThreadPoolExecutor(
+    max_workers=getattr(settings, 'DATA_EXPORT_WORKERS', 1),
+    thread_name_prefix='data-export',
+)
+
+
+def start_export(export):
+    export_id= export.pk
+    transaction.on_commit(lambda: _executor.submit(run_export, export_id))
+
+
+def expire_stale(exports):
+    """Mark pending/running exports in `exports` failed once they time out."""
+    from .models import DataExport
+
+    cutoff= timezone.now() - timedelta(seconds=getattr(settings, 'DATA_EXPORT_TIMEOUT_SECONDS', 3600))
+    return exports.filter(
+        status__in=[DataExport.PENDING, DataExport.RUNNING], created_at__lt=cutoff
+    ).update(status=DataExport.FAILED, error='timed out', finished_at=timezone.now())
+
+
+def run_export(export_id):
+    from .models import DataExport
+
+    close_old_connections()
+    try:
+        export= DataExport.objects.select_related('user').get(pk=export_id)
+        DataExport.objects.filter(pk=export_id).update(status=DataExport.RUNNING)
+
+        with tempfile.TemporaryFile() as tmp:
+            write_archive(export.user, tmp)
+            tmp.seek(0)
+            export.archive.save(f'{uuid.uuid4().hex}.zip', File(tmp), save=False)
+
+        export.status= DataExport.DONE
+        export.finished_at= timezone.now()
+        export.save(update_fields=['archive', 'status', 'finished_at'])
+
+    except Exception as e:
+        DataExport.objects.filter(pk=export_id).update(
+            status=DataExport.FAILED, error=str(e), finished_at=timezone.now()
+        )
+    finally:
+        connections.close_all()
+
+
+def _write_json(archive, name, data):
+    with archive.open(name, 'w') as f:
+        f.write(DjangoJSONEncoder(indent=2).encode(data).encode('utf-8'))
+
+
+def _write_lines(archive, name, rows, fields):
+    # Size is unknown up front, so allow the entry to grow past 2 GiB
+    with archive.open(name, 'w', force_zip64=True) as f:
+        for block in blocks(ndjson_lines(rows, fields)):
+            f.write(block)
+
+
+def write_archive(user, fileobj, chunk_size=2000):
+    from .models import Profile, Follow
+
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        _write_json(archive, 'account.json', {field: getattr(user, field) for field in ACCOUNT_FIELDS})
+
+        profile= Profile.objects.filter(user=user).values(*PROFILE_FIELDS, 'id').first()
+        if profile is None:
+            return
+
+        profile_id= profile.pop('id')
+        _write_json(archive, 'profile.json', profile)
+
+        followers= Follow.objects.filter(following_id=profile_id).order_by('-created_at', '-id').values_list(
+            'follower__slug', 'follower__first_name', 'follower__last_name', 'created_at'
+        ).iterator(chunk_size=chunk_size)
+        _write_lines(archive, 'followers.ndjson', followers, FOLLOW_FIELDS)
+
+        following= Follow.objects.filter(follower_id=profile_id).order_by('-created_at', '-id').values_list(
+            'following__slug', 'following__first_name', 'following__last_name', 'created_at'
+        ).iterator(chunk_size=chunk_size)
+        _write_lines(archive, 'following.ndjson', following, FOLLOW_FIELDS)
+
+        image= profile['profile_img']
+        if image:
+            storage= Profile._meta.get_field('profile_img').storage
+            if storage.exists(image):
+                with storage.open(image, 'rb') as src, archive.open(f'media/{os.path.basename(image)}', 'w') as dst:
+                    shutil.copyfileobj(src, dst, 64 * 1024)
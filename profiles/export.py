@@ -0,0 +1,81 @@
+"""
+Streaming profile export.
+
+Rows come from `values_list().iterator()` and are turned into NDJSON or CSV
+lines one at a time, grouped into ~64 KB blocks and optionally gzip
+compressed on the fly, so memory stays flat however many profiles there are.
+"""
+import csv
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+EXPORT_FIELDS= (
+    'id', 'slug', 'first_name', 'last_name', 'bio', 'phone', 'address', 'is_private', 'profile_img',
+    'followers_count', 'following_count', 'influence_score', 'last_active_at',
+)
+
+BLOCK_SIZE= 64 * 1024
+
+
+def profile_rows(chunk_size=2000):
+    from .models import Profile
+
+    return Profile.objects.order_by('pk').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def ndjson_lines(rows, fields=EXPORT_FIELDS):
+    encoder= DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, fields=EXPORT_FIELDS):
+    writer= csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def blocks(lines, block_size=BLOCK_SIZE):
+    """Group small text lines into larger byte blocks."""
+    buffer= []
+    size= 0
+    for line in lines:
+        data= line.encode('utf-8')
+        buffer.append(data)
+        size+= len(data)
+        if size >= block_size:
+            yield b''.join(buffer)
+            buffer= []
+            size= 0
+
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzipped(chunks, level=6):
+    compressor= zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data= compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(output='ndjson', compress=False, chunk_size=2000):
+    rows= profile_rows(chunk_size=chunk_size)
+    lines= csv_lines(rows) if output == 'csv' else ndjson_lines(rows)
+
+    stream= blocks(lines)
+    if compress:
+        stream= gzipped(stream)
+    return stream
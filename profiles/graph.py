@@ -0,0 +1,134 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from django.conf import settings
+
+from userprofile.background import BackgroundTask
+
+
+class FollowGraph:
+    """
+    Read-only snapshot of the Follow table as sorted int64 arrays.
+
+    `following[a]` holds every profile id `a` follows and `followers[b]` every
+    profile id following `b`, both ascending, so membership is a bisect and
+    neighbour lists can be fed straight into a C-level Counter update.
+    """
+
+    # How much each signal counts towards a suggestion's score
+    FRIEND_OF_FRIEND_WEIGHT= 2
+    SHARED_FOLLOWER_WEIGHT= 1
+    FOLLOWS_YOU_WEIGHT= 3
+
+    def __init__(self, following, followers, private, built_at):
+        self.following= following
+        self.followers= followers
+        self.private= private
+        self.built_at= built_at
+
+    @classmethod
+    def build(cls, chunk_size=10000):
+        from .models import Follow, Profile
+
+        following= {}
+        followers= {}
+        current, bucket= None, None
+
+        edges= Follow.objects.order_by('follower_id', 'following_id').values_list(
+            'follower_id', 'following_id'
+        ).iterator(chunk_size=chunk_size)
+
+        for follower_id, following_id in edges:
+            if follower_id != current:
+                current= follower_id
+                bucket= following[follower_id]= array('q')
+            bucket.append(following_id)
+            followers.setdefault(following_id, array('q')).append(follower_id)
+
+        # Follower arrays were filled in follower order, which is already ascending
+        private= frozenset(Profile.objects.filter(is_private=True).values_list('id', flat=True))
+
+        return cls(following, followers, private, time.monotonic())
+
+    def follows(self, a, b):
+        row= self.following.get(a)
+        if not row:
+            return False
+        i= bisect_left(row, b)
+        return i < len(row) and row[i] == b
+
+    def suggest(self, viewer_id, limit=20, max_fanout=1000):
+        """Top `limit` (profile_id, score) pairs for the viewer."""
+        empty= array('q')
+        my_following= self.following.get(viewer_id, empty)
+        my_followers= self.followers.get(viewer_id, empty)
+
+        scores= Counter()
+        for friend in my_following[:max_fanout]:
+            scores.update(self.following.get(friend, empty)[:max_fanout])
+        for key in scores:
+            scores[key]*= self.FRIEND_OF_FRIEND_WEIGHT
+
+        shared= Counter()
+        for fan in my_followers[:max_fanout]:
+            shared.update(self.following.get(fan, empty)[:max_fanout])
+        for key, count in shared.items():
+            scores[key]+= count * self.SHARED_FOLLOWER_WEIGHT
+
+        for fan in my_followers:
+            scores[fan]+= self.FOLLOWS_YOU_WEIGHT
+
+        candidates= (
+            (profile_id, score) for profile_id, score in scores.items()
+            if profile_id != viewer_id
+            and profile_id not in self.private
+            and not self.follows(viewer_id, profile_id)
+        )
+        return heapq.nlargest(limit, candidates, key=lambda item: (item[1], -item[0]))
+
+
+_graph= None
+_graph_lock= threading.Lock()
+
+
+def _build_first():
+    global _graph
+    with _graph_lock:
+        if _graph is None:
+            _graph= FollowGraph.build()
+
+
+def _refresh():
+    global _graph
+    _graph= FollowGraph.build()
+
+
+_warmup= BackgroundTask('follow-graph-warmup', _build_first)
+_refresher= BackgroundTask('follow-graph-refresh', _refresh)
+
+
+def warm():
+    """Start building the first snapshot in the background (called at startup)."""
+    if _graph is None:
+        _warmup.start()
+
+
+def get_graph():
+    """
+    Current snapshot. Without a warm() at startup the first call builds it
+    inline (or waits for the warm-up build); afterwards a stale snapshot
+    keeps serving while a background thread builds the next one.
+    """
+    if _graph is None:
+        _build_first()
+        return _graph
+
+    max_age= getattr(settings, 'SUGGESTIONS_REFRESH_SECONDS', 300)
+    if time.monotonic() - _graph.built_at > max_age:
+        _refresher.start()
+
+    return _graph
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from profiles.benchmark import make_users, measure, rolled_back
+from profiles.models import Profile, Follow
+from profiles.rendering import ProfileRows, follow_rows
+from profiles.serializers import ProfileSerializer, SimpleUserSerializer
+
+
+class Command(BaseCommand):
+    help= "Compare ProfileSerializer / SimpleUserSerializer with the values() fast path (all writes are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+
+    def handle(self, *args, **options):
+        for size in options['sizes']:
+            with rolled_back():
+                self.seed(size)
+
+                runs= [
+                    ('ProfileSerializer', self.profiles_serializer),
+                    ('ProfileRows', self.profiles_fast),
+                    ('SimpleUserSerializer', self.follows_serializer),
+                    ('follow_rows', self.follows_fast),
+                ]
+                results= {}
+                for label, fn in runs:
+                    results[label], seconds, _, _= measure(fn)
+                    _, _, _, peak= measure(fn, trace_memory=True)
+
+                    self.stdout.write(
+                        f"{label:<22} {size:>7} rows  {seconds:8.3f}s  {seconds / size * 1e6:8.1f} us/row  "
+                        f"peak {peak / 2**20:8.1f} MiB"
+                    )
+
+                same= (
+                    results['ProfileSerializer'] == results['ProfileRows']
+                    and results['SimpleUserSerializer'] == results['follow_rows']
+                )
+                self.stdout.write(f"identical output at {size} rows: {'yes' if same else 'NO'}")
+
+    def seed(self, size):
+        users= make_users(size)
+        # Far enough back that last_seen_human cannot tick over between runs
+        last_active_at= timezone.now() - timedelta(days=3)
+        profiles= Profile.objects.bulk_create([
+            Profile(
+                user=user, first_name='Bench', last_name=str(i), slug=f'bench-{user.pk}', last_active_at=last_active_at,
+                bio='Lorem ipsum dolor sit amet ' * 4, link1_name='Site', link1_url='https://example.com',
+            )
+            for i, user in enumerate(users)
+        ], batch_size=1000)
+
+        self.target= profiles[0]
+        Follow.objects.bulk_create(
+            [Follow(follower=profile, following=self.target) for profile in profiles[1:]],
+            batch_size=1000,
+        )
+
+    def profiles_serializer(self):
+        return [dict(row) for row in ProfileSerializer(Profile.objects.order_by('id'), many=True).data]
+
+    def profiles_fast(self):
+        rows= ProfileRows()
+        return rows.render(rows.values(Profile.objects.order_by('id')))
+
+    def follows_serializer(self):
+        follows= Follow.objects.filter(following=self.target).select_related('follower').order_by('-created_at', '-id')
+        return [dict(row) for row in SimpleUserSerializer([f.follower for f in follows], many=True).data]
+
+    def follows_fast(self):
+        rows= follow_rows('follower')
+        return rows.render(rows.values(Follow.objects.filter(following=self.target).order_by('-created_at', '-id')))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from profiles.benchmark import make_users, measure, rolled_back
+from profiles.models import Profile
+
+
+class Command(BaseCommand):
+    help= "Benchmark slug allocation for many profiles sharing one name (all writes are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500)
+        parser.add_argument('--skip-legacy', action='store_true', help="Skip the old exists()-loop allocator (quadratic)")
+
+    def handle(self, *args, **options):
+        count= options['count']
+        runs= [('Profile.save()', self.save_each), ('bulk_create_profiles', self.bulk)]
+        if not options['skip_legacy']:
+            runs.insert(0, ('legacy exists() loop', self.legacy_each))
+
+        for label, fn in runs:
+            with rolled_back():
+                users= make_users(count)
+                _, seconds, queries, _= measure(fn, users)
+
+            self.stdout.write(
+                f"{label:<24} {count} profiles  {seconds:8.3f}s  {queries:8} queries  "
+                f"{seconds / count * 1e6:10.1f} us/profile"
+            )
+
+    def legacy_each(self, users):
+        for user in users:
+            profile= Profile(user=user, first_name='John', last_name='Smith')
+            base_slug= Profile.base_slug(profile.first_name, profile.last_name)
+            unique_slug= base_slug
+            num= 1
+
+            while Profile.objects.filter(slug= unique_slug).exists():
+                unique_slug= f"{base_slug}-{num}"
+                num+= 1
+
+            profile.slug= unique_slug
+            profile.save()
+
+    def save_each(self, users):
+        for user in users:
+            Profile(user=user, first_name='John', last_name='Smith').save()
+
+    def bulk(self, users):
+        Profile.objects.bulk_create_profiles(
+            [Profile(user=user, first_name='John', last_name='Smith') for user in users]
+        )
@@ -0,0 +1,34 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from profiles.export import export_stream
+
+
+class Command(BaseCommand):
+    help= "Stream every profile to a file (or stdout) as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=['ndjson', 'csv'], default='ndjson')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--file', help="Write here instead of stdout")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started= time.perf_counter()
+        written= 0
+
+        target= open(options['file'], 'wb') if options['file'] else sys.stdout.buffer
+        try:
+            for block in export_stream(options['output'], options['gzip'], options['chunk_size']):
+                target.write(block)
+                written+= len(block)
+        finally:
+            if options['file']:
+                target.close()
+
+        if options['file']:
+            self.stdout.write(self.style.SUCCESS(
+                f"wrote {written} bytes to {options['file']} in {time.perf_counter() - started:.2f}s"
+            ))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles import search
+
+
+class Command(BaseCommand):
+    help= "Rebuild the FTS5 profile search index from the Profile table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not search.available():
+            raise CommandError("profile search index needs the sqlite backend (FTS5)")
+
+        started= time.perf_counter()
+        total= search.rebuild(chunk_size=options['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"indexed {total} profiles in {time.perf_counter() - started:.2f}s"
+        ))
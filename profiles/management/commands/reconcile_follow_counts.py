@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from profiles.cache import bump_profile_versions
+from profiles.counters import followers_subquery, following_subquery
+from profiles.models import Profile
+
+
+class Command(BaseCommand):
+    help= "Recompute Profile.followers_count / following_count from the Follow table"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing")
+
+    def handle(self, *args, **options):
+        batch_size= options['batch_size']
+        dry_run= options['dry_run']
+
+        started= time.perf_counter()
+        checked= fixed= 0
+        last_pk= 0
+
+        while True:
+            # One aggregate query per chunk: stored and real counts side by side
+            rows= list(
+                Profile.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .annotate(real_followers=followers_subquery(), real_following=following_subquery())
+                .values_list('pk', 'followers_count', 'following_count', 'real_followers', 'real_following')[:batch_size]
+            )
+            if not rows:
+                break
+
+            last_pk= rows[-1][0]
+            checked+= len(rows)
+
+            now= timezone.now()
+            drifted= [
+                Profile(pk=pk, followers_count=real_followers, following_count=real_following, updated_at=now)
+                for pk, followers, following, real_followers, real_following in rows
+                if followers != real_followers or following != real_following
+            ]
+
+            if drifted and not dry_run:
+                Profile.objects.bulk_update(drifted, ['followers_count', 'following_count', 'updated_at'])
+                bump_profile_versions([profile.pk for profile in drifted])
+            fixed+= len(drifted)
+
+        elapsed= time.perf_counter() - started
+        action= 'drifted' if dry_run else 'fixed'
+        self.stdout.write(self.style.SUCCESS(
+            f"checked {checked} profiles, {action} {fixed} in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,237 @@
+import re
+
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Length
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+
+class ProfileManager(models.Manager):
+
+    # Slugs are ASCII and '-' sorts right before '.', so every slug that is
+    # `base` or starts with `base-` lies in the index range [base, base + '.')
+    def _slug_range(self, base_slug):
+        return Q(slug__gte=base_slug, slug__lt=base_slug + '.')
+
+    @staticmethod
+    def _suffixes(base_slug, slugs):
+        pattern= re.compile(rf'^{re.escape(base_slug)}(?:-(\d+))?$')
+        for slug in slugs:
+            match= pattern.match(slug)
+            if match:
+                yield int(match.group(1) or 0)
+
+    def next_slug(self, base_slug):
+        """
+        Pick the next free `base_slug` / `base_slug-N` with a single index
+        range query. Longest-then-highest ordering puts the largest numeric
+        suffix first, so normally only the first row is read.
+        """
+        candidates= self.filter(self._slug_range(base_slug)).order_by(
+            Length('slug').desc(), '-slug'
+        ).values_list('slug', flat=True)
+
+        for slug in candidates.iterator(chunk_size=32):
+            for suffix in self._suffixes(base_slug, [slug]):
+                return f'{base_slug}-{suffix + 1}'
+
+        return base_slug
+
+    def assign_slugs(self, profiles):
+        """Give every profile without a slug a unique one, reading existing slugs once per batch."""
+        from .models import Profile
+
+        # Unsaved model instances are unhashable, so keep (profile, base) pairs
+        pending= [(p, Profile.base_slug(p.first_name, p.last_name)) for p in profiles if not p.slug]
+        if not pending:
+            return
+
+        bases= {base_slug for profile, base_slug in pending}
+        condition= Q()
+        for base_slug in bases:
+            condition|= self._slug_range(base_slug)
+
+        existing= list(self.filter(condition).values_list('slug', flat=True))
+        existing+= [p.slug for p in profiles if p.slug]
+
+        next_suffix= {}
+        for base_slug in bases:
+            taken= list(self._suffixes(base_slug, existing))
+            next_suffix[base_slug]= max(taken) + 1 if taken else 0
+
+        for profile, base_slug in pending:
+            suffix= next_suffix[base_slug]
+            profile.slug= f'{base_slug}-{suffix}' if suffix else base_slug
+            next_suffix[base_slug]= suffix + 1
+
+    def bulk_create_profiles(self, profiles, batch_size=1000, retries=3):
+        """
+        bulk_create with slugs allocated in memory. bulk_create skips
+        post_save, so the search and autocomplete indexes are fed here.
+        """
+        from . import search
+        from .autocomplete import index as autocomplete_index
+
+        profiles= list(profiles)
+        created= []
+
+        for start in range(0, len(profiles), batch_size):
+            batch= profiles[start:start + batch_size]
+            originals= [p.slug for p in batch]
+
+            for attempt in range(retries):
+                self.assign_slugs(batch)
+                try:
+                    with transaction.atomic(using=self.db):
+                        created+= self.bulk_create(batch)
+                        search.index_profiles(batch)
+                    break
+                except IntegrityError:
+                    # A concurrent writer took one of our slugs; allocate again
+                    for profile, slug in zip(batch, originals):
+                        profile.slug= slug
+                    if attempt == retries - 1:
+                        raise
+
+        if autocomplete_index.built_at is not None:
+            for profile in created:
+                autocomplete_index.update(profile)
+
+        return created
+
+
+class FollowManager(models.Manager):
+    """
+    Idempotent follow / unfollow.
+
+    Each call is one write statement on Follow (INSERT ... ON CONFLICT DO
+    NOTHING, or a filtered DELETE); the counters on Profile are only touched
+    when that statement actually changed a row.
+    """
+
+    def _insert_ignore(self, follower_id, following_id):
+        db= router.db_for_write(self.model)
+        connection= connections[db]
+        ops= connection.ops
+        opts= self.model._meta
+
+        fields= [opts.get_field('follower'), opts.get_field('following'), opts.get_field('created_at')]
+        columns= ', '.join(ops.quote_name(f.column) for f in fields)
+        values= [
+            follower_id,
+            following_id,
+            fields[2].get_db_prep_value(timezone.now(), connection),
+        ]
+
+        sql= '{} {} ({}) VALUES (%s, %s, %s) {}'.format(
+            ops.insert_statement(on_conflict=OnConflict.IGNORE),
+            ops.quote_name(opts.db_table),
+            columns,
+            ops.on_conflict_suffix_sql(fields, OnConflict.IGNORE, None, None),
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, values)
+            return cursor.rowcount > 0
+
+    def _bump_counters(self, follower_id, following_ids, delta):
+        """One profile followed (delta 1) or unfollowed (-1) each of `following_ids`."""
+        from .models import Profile
+
+        now= timezone.now()
+        Profile.objects.filter(pk=follower_id).update(
+            following_count=F('following_count') + delta * len(following_ids), updated_at=now
+        )
+        Profile.objects.filter(pk__in=following_ids).update(followers_count=F('followers_count') + delta, updated_at=now)
+
+    def _changed(self, profile_ids):
+        from .cache import bump_relationship_versions, bump_profile_versions
+
+        # Counters moved too, so cached profile payloads are stale as well
+        profile_ids= list(profile_ids)
+        transaction.on_commit(
+            lambda: (bump_relationship_versions(profile_ids), bump_profile_versions(profile_ids)),
+            using=router.db_for_write(self.model),
+        )
+
+    def follow(self, follower_id, following_id):
+        """Returns True when a new Follow row was written."""
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            created= self._insert_ignore(follower_id, following_id)
+            if created:
+                self._bump_counters(follower_id, [following_id], 1)
+                self._changed([follower_id, following_id])
+
+        return created
+
+    def unfollow(self, follower_id, following_id):
+        """Returns True when an existing Follow row was removed."""
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            deleted, _= self.filter(follower_id=follower_id, following_id=following_id).delete()
+            if deleted:
+                self._bump_counters(follower_id, [following_id], -1)
+                self._changed([follower_id, following_id])
+
+        return bool(deleted)
+
+    def detach(self, profile_id):
+        """
+        Take a profile about to be deleted out of its counterparts' counters.
+        Its Follow rows go with it (CASCADE), which bypasses unfollow().
+        """
+        from .models import Profile
+
+        followed= self.filter(follower_id=profile_id).values('following_id')
+        fans= self.filter(following_id=profile_id).values('follower_id')
+        counterparts= set(followed.values_list('following_id', flat=True)) | set(fans.values_list('follower_id', flat=True))
+        if not counterparts:
+            return
+
+        now= timezone.now()
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            Profile.objects.filter(pk__in=followed).update(followers_count=F('followers_count') - 1, updated_at=now)
+            Profile.objects.filter(pk__in=fans).update(following_count=F('following_count') - 1, updated_at=now)
+            self._changed(counterparts)
+
+    def bulk_follow(self, follower_id, following_ids):
+        """Follow many profiles at once. Returns the ids that were newly followed."""
+        following_ids= set(following_ids) - {follower_id}
+        if not following_ids:
+            return set()
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            existing= set(
+                self.filter(follower_id=follower_id, following_id__in=following_ids).values_list('following_id', flat=True)
+            )
+            created= following_ids - existing
+
+            if created:
+                self.bulk_create(
+                    [self.model(follower_id=follower_id, following_id=pk) for pk in created],
+                    ignore_conflicts=True,
+                )
+                # Same increments as follow(); a row lost to a concurrent follow of the
+                # same pair is left to reconcile_follow_counts
+                self._bump_counters(follower_id, created, 1)
+                self._changed(created | {follower_id})
+
+        return created
+
+    def bulk_unfollow(self, follower_id, following_ids):
+        """Unfollow many profiles at once. Returns the ids that were actually unfollowed."""
+        following_ids= set(following_ids)
+        if not following_ids:
+            return set()
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            removed= set(
+                self.filter(follower_id=follower_id, following_id__in=following_ids).values_list('following_id', flat=True)
+            )
+
+            if removed:
+                self.filter(follower_id=follower_id, following_id__in=removed).delete()
+                self._bump_counters(follower_id, removed, -1)
+                self._changed(removed | {follower_id})
+
+        return removed
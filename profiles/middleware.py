@@ -1,38 +1,21 @@
-from django.utils import timezone
-from .models import Profile
+from .presence import tracker
 
 
-class UpdateLastSeenMiddleware:
+class LastActiveMiddleware:
+    """
+    Records activity after the view has run, so users authenticated by DRF
+    (JWT) are seen as well as session users. The write itself is batched by
+    the presence tracker.
+    """
+
     def __init__(self, get_response):
         self.get_response= get_response
-    
-    def __call__(self, request):
-        
-        if request.user.is_authenticated:
-            try:
-                profile= Profile.objects.get(user= request.user)
-                profile.last_active_at= timezone.now()
-
-                profile.save(update_fields=['last_active_at'])
-            
-            except Profile.DoesNotExist:
-                pass
 
+    def __call__(self, request):
         response= self.get_response(request)
-        return response
-        
-class LastActiveMiddleware:
-    def __init__(self, get_response):
-        self.get_response= get_response
 
-    def __call__(self,request):
-        if request.user.is_authenticated:
-            try:
-                profile= Profile.objects.get(user=request.user)
-                profile.update_last_active()
-            except Profile.DoesNotExist:
-                pass
+        user= getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            tracker.record(user.pk)
 
-        response= self.get_response(request)
         return response
-
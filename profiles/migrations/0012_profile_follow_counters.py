@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:55
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from profiles.counters import followers_subquery, following_subquery
+
+    Profile= apps.get_model('profiles', 'Profile')
+    Follow= apps.get_model('profiles', 'Follow')
+
+    Profile.objects.update(
+        followers_count= followers_subquery(Follow),
+        following_count= following_subquery(Follow),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0011_rename_create_at_follow_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='followers_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
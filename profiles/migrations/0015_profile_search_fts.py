@@ -0,0 +1,35 @@
+from django.db import migrations
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS profiles_profile_search USING fts5("
+        "first_name, last_name, bio, is_private UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    schema_editor.execute(
+        "INSERT INTO profiles_profile_search (rowid, first_name, last_name, bio, is_private) "
+        "SELECT id, COALESCE(first_name, ''), COALESCE(last_name, ''), COALESCE(bio, ''), is_private "
+        "FROM profiles_profile"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute("DROP TABLE IF EXISTS profiles_profile_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0014_profile_influence_score'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -1,8 +1,14 @@
-from django.db import models
+from django.db import models, transaction, IntegrityError
 from django.conf import settings
 from django.utils.text import slugify
 
 from django.utils import timezone
+
+from .manager import FollowManager, ProfileManager
+
+SLUG_RETRIES= 5
+
+
 class Profile(models.Model):
     user= models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     first_name= models.CharField(max_length=50, null=True, blank=True)
@@ -27,6 +33,25 @@ class Profile(models.Model):
 
     slug= models.SlugField(unique=True, blank=True)
 
+    # Denormalized counters, kept in step with Follow by the follow views.
+    # `python manage.py reconcile_follow_counts` repairs any drift.
+    followers_count= models.PositiveIntegerField(default=0)
+    following_count= models.PositiveIntegerField(default=0)
+
+    # PageRank over the follow graph, written by `python manage.py compute_influence`
+    influence_score= models.FloatField(default=0)
+
+    # Moves on every save and whenever the follow counters change; feeds the
+    # ETag / Last-Modified validators of the profile endpoints
+    updated_at= models.DateTimeField(auto_now=True)
+
+    objects= ProfileManager()
+
+    class Meta:
+        indexes= [
+            models.Index(fields=['influence_score', 'id'], name='profile_influence_idx'),
+        ]
+
     def update_last_active(self, update_db=True):
         self.last_active_at= timezone.now()
 
@@ -36,21 +61,97 @@ class Profile(models.Model):
             ).update(
                 last_active_at= self.last_active_at
             )
+            self._remember(['last_active_at'])
     
 
+    @staticmethod
+    def base_slug(first_name, last_name):
+        return slugify(f'{first_name}-{last_name}')
+
+    """Change tracking: column values as last loaded from / written to the database"""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance= super().from_db(db, field_names, values)
+        instance._remember()
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        self._remember(fields)
+
+    def _current(self, field):
+        value= getattr(self, field.attname)
+        # FieldFile compares by name; keep the plain name
+        return getattr(value, 'name', value) if isinstance(field, models.FileField) else value
+
+    def _remember(self, names=None):
+        if not hasattr(self, '_loaded_values'):
+            self._loaded_values= {}
+
+        for field in self._meta.concrete_fields:
+            if names is not None and field.name not in names and field.attname not in names:
+                continue
+            # Deferred fields are not in __dict__ until they are first read
+            if field.attname in self.__dict__:
+                self._loaded_values[field.attname]= self._current(field)
+
+    def initial_value(self, name):
+        """The value `name` had when loaded or last saved (None if never loaded)."""
+        return getattr(self, '_loaded_values', {}).get(self._meta.get_field(name).attname)
+
+    def get_dirty_fields(self):
+        """
+        Names of the concrete fields changed since load / last save, or None
+        when the instance was not loaded from the database.
+        """
+        loaded= getattr(self, '_loaded_values', None)
+        if loaded is None or self._state.adding:
+            return None
+
+        dirty= []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname not in self.__dict__:
+                continue
+            if field.attname not in loaded or loaded[field.attname] != self._current(field):
+                dirty.append(field.name)
+
+        return dirty
+
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base_slug= slugify(f'{self.first_name}-{self.last_name}')
-            unique_slug= base_slug
-            num= 1
-
-            while Profile.objects.filter(slug= unique_slug).exists():
-                unique_slug= f"{base_slug}-{num}"
-                num+= 1
-                
-            self.slug= unique_slug
-
-        super().save(*args, **kwargs)
+        """
+        Updates of a loaded profile write only the changed columns (plus
+        updated_at) and are skipped entirely, signals included, when nothing
+        changed. Pass update_fields to opt out.
+        """
+        if self.slug and not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            dirty= self.get_dirty_fields()
+            if dirty is not None:
+                dirty= [name for name in dirty if name != 'updated_at']
+                if not dirty:
+                    return
+                kwargs['update_fields']= dirty + ['updated_at']
+
+        self._save(*args, **kwargs)
+        self._remember()
+
+    def _save(self, *args, **kwargs):
+        if self.slug:
+            return super().save(*args, **kwargs)
+
+        base_slug= Profile.base_slug(self.first_name, self.last_name)
+
+        for attempt in range(SLUG_RETRIES):
+            self.slug= Profile.objects.next_slug(base_slug)
+            try:
+                with transaction.atomic(using=kwargs.get('using')):
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                # Lost the race for this slug to a concurrent create; try the next one
+                taken= Profile.objects.filter(slug=self.slug).exists()
+                self.slug= ''
+                if not taken or attempt == SLUG_RETRIES - 1:
+                    raise
             
     def __str__(self):
         return f"{self.user.email} Profile"
@@ -62,10 +163,42 @@ class Follow(models.Model):
 
     created_at= models.DateTimeField(auto_now_add=True)
 
+    objects= FollowManager()
+
     class Meta:
         unique_together= ('follower', 'following')
+        indexes= [
+            # Back the newest-first keyset pages of the follower / following lists
+            models.Index(fields=['following', 'created_at'], name='follow_following_created_idx'),
+            models.Index(fields=['follower', 'created_at'], name='follow_follower_created_idx'),
+        ]
 
     def  __str__(self):
         return f"{self.follower}- {self.following}"
 
 
+
+
+class DataExport(models.Model):
+    PENDING= 'pending'
+    RUNNING= 'running'
+    DONE= 'done'
+    FAILED= 'failed'
+
+    STATUS_CHOICES= [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    user= models.ForeignKey(settings.AUTH_USER_MODEL, related_name='data_exports', on_delete=models.CASCADE)
+    status= models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    archive= models.FileField(upload_to='exports/', blank=True, null=True)
+    error= models.TextField(blank=True, default='')
+
+    created_at= models.DateTimeField(auto_now_add=True)
+    finished_at= models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"{self.user} export {self.status}"
@@ -0,0 +1,185 @@
+"""
+Keyset (seek) pagination.
+
+Every page is fetched with `WHERE (ordering) > (last seen values) LIMIT n`
+so page cost does not depend on how deep the client is. No OFFSET is ever used,
+which means the ordering must end with a unique column (normally `id`).
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values, reverse=False):
+    payload= {'v': values}
+    if reverse:
+        payload['r']= 1
+
+    raw= json.dumps(payload, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded= cursor + '=' * (-len(cursor) % 4)
+        payload= json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return list(payload['v']), bool(payload.get('r'))
+    except (TypeError, ValueError, KeyError):
+        raise NotFound('Invalid cursor')
+
+
+def keyset_filter(ordering, values):
+    """Build `(f1, f2, ...) > (v1, v2, ...)` honouring each field's direction."""
+    condition= Q()
+    for i in range(len(ordering) - 1, -1, -1):
+        name= ordering[i].lstrip('-')
+        lookup= 'lt' if ordering[i].startswith('-') else 'gt'
+
+        step= Q(**{f'{name}__{lookup}': values[i]})
+        if i < len(ordering) - 1:
+            step|= Q(**{name: values[i]}) & condition
+        condition= step
+
+    return condition
+
+
+def reverse_ordering(ordering):
+    return [o[1:] if o.startswith('-') else f'-{o}' for o in ordering]
+
+
+class KeysetPagination(BasePagination):
+    ordering= ('id',)
+    cursor_query_param= 'cursor'
+    page_size_query_param= 'page_size'
+
+    def __init__(self, ordering=None):
+        if ordering is not None:
+            self.ordering= tuple(ordering)
+
+        self.page_size= getattr(settings, 'PROFILE_PAGE_SIZE', 20)
+        self.max_page_size= getattr(settings, 'PROFILE_MAX_PAGE_SIZE', 100)
+
+    def get_page_size(self, request):
+        try:
+            size= int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return max(1, min(size, self.max_page_size))
+
+    def get_value(self, item, name):
+        if isinstance(item, dict):
+            return item[name]
+
+        for part in name.split('__'):
+            item= getattr(item, part)
+        return item
+
+    def to_python(self, queryset, values):
+        model= queryset.model
+        converted= []
+        for name, value in zip(self.ordering, values):
+            field= model._meta.get_field(name.lstrip('-').split('__')[0])
+            if field.is_relation:
+                field= field.target_field
+            converted.append(field.to_python(value))
+
+        return converted
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request= request
+        size= self.get_page_size(request)
+
+        cursor= request.query_params.get(self.cursor_query_param)
+        reverse= False
+        ordering= list(self.ordering)
+
+        if cursor:
+            values, reverse= decode_cursor(cursor)
+            if len(values) != len(ordering):
+                raise NotFound('Invalid cursor')
+
+            try:
+                values= self.to_python(queryset, values)
+            except Exception:
+                raise NotFound('Invalid cursor')
+
+            if reverse:
+                ordering= reverse_ordering(ordering)
+            queryset= queryset.filter(keyset_filter(ordering, values))
+
+        rows= list(queryset.order_by(*ordering)[:size + 1])
+        has_more= len(rows) > size
+        rows= rows[:size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next= True
+            self.has_previous= has_more
+        else:
+            self.has_next= has_more
+            self.has_previous= bool(cursor)
+
+        self.page= rows
+        return rows
+
+    def cursor_for(self, item, reverse=False):
+        values= [self.get_value(item, name.lstrip('-')) for name in self.ordering]
+        return encode_cursor(values, reverse)
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+
+        url= self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.cursor_for(self.page[-1]))
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+
+        url= self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.cursor_for(self.page[0], reverse=True))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor returned in `next` / `previous`',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results per page (max {self.max_page_size})',
+                'schema': {'type': 'integer'},
+            },
+        ]
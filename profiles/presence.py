@@ -0,0 +1,119 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Case, When, Value
+from django.utils import timezone
+
+
+logger= logging.getLogger(__name__)
+
+
+class PresenceTracker:
+    """
+    Write-behind buffer for `Profile.last_active_at`.
+
+    Requests only touch an in-process dict. Hits from the same user inside
+    `window` seconds are merged, and the buffer is written with a single
+    bulk UPDATE every `flush_interval` seconds, when it reaches `max_pending`
+    users, or when the process exits.
+    """
+
+    def __init__(self, window=60, flush_interval=10, max_pending=500):
+        self.window= window
+        self.flush_interval= flush_interval
+        self.max_pending= max_pending
+
+        self._pending= {}
+        self._last_recorded= {}
+        self._lock= threading.Lock()
+        self._flush_lock= threading.Lock()
+        self._timer= None
+
+    def record(self, user_id, when=None):
+        now= time.monotonic()
+
+        with self._lock:
+            last= self._last_recorded.get(user_id)
+            if last is not None and now - last < self.window:
+                return
+
+            self._last_recorded[user_id]= now
+            self._pending[user_id]= when or timezone.now()
+            full= len(self._pending) >= self.max_pending
+
+        if full:
+            self.flush()
+        else:
+            self._ensure_timer()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending= self._pending, {}
+
+            cutoff= time.monotonic() - self.window
+            self._last_recorded= {
+                user_id: seen for user_id, seen in self._last_recorded.items() if seen > cutoff
+            }
+
+        if not pending:
+            return 0
+
+        from .models import Profile
+        from .cache import bump_profile_versions
+
+        with self._flush_lock:
+            profiles= Profile.objects.filter(user_id__in=pending.keys())
+            updated= profiles.update(
+                last_active_at=Case(
+                    *[When(user_id=user_id, then=Value(when)) for user_id, when in pending.items()]
+                )
+            )
+            # Cached profile pages carry last_active_at
+            bump_profile_versions(profiles.values_list('id', flat=True))
+            return updated
+
+    def _ensure_timer(self):
+        if self._timer is not None:
+            return
+
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer= threading.Thread(target=self._run, name='presence-flush', daemon=True)
+            self._timer.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception("presence flush failed")
+
+
+tracker= PresenceTracker(
+    window= getattr(settings, 'PRESENCE_WINDOW_SECONDS', 60),
+    flush_interval= getattr(settings, 'PRESENCE_FLUSH_INTERVAL', 10),
+    max_pending= getattr(settings, 'PRESENCE_MAX_PENDING', 500),
+)
+
+
+def _flush_on_exit():
+    if not tracker._pending:
+        return
+
+    try:
+        tracker.flush()
+    except DatabaseError as e:
+        # The database can already be gone at exit, e.g. a test run drops its database first
+        logger.debug("presence flush at exit skipped: %s", e)
+    except Exception:
+        logger.exception("presence flush at exit failed")
+
+
+atexit.register(_flush_on_exit)
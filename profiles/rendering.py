@@ -0,0 +1,79 @@
+"""
+Read-only fast path for the profile list endpoints.
+
+Rows are pulled with values() and formatted in one loop: no model instances
+and no per-field serializer dispatch. The output matches what
+ProfileSerializer / SimpleUserSerializer would produce for the same rows,
+`python manage.py bench_profile_render` compares the two.
+"""
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .serializers import ProfileSerializer, SimpleUserSerializer, last_seen_human
+
+
+def _datetime():
+    """DRF's DateTimeField output, with the active timezone looked up once per page."""
+    if api_settings.DATETIME_FORMAT != ISO_8601:
+        return serializers.DateTimeField().to_representation
+
+    tz= timezone.get_current_timezone() if settings.USE_TZ else None
+
+    def convert(value):
+        if value is None:
+            return None
+        if tz is not None and timezone.is_aware(value):
+            value= value.astimezone(tz)
+
+        value= value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _image_url(storage):
+    def convert(name):
+        return storage.url(name) if name else None
+    return convert
+
+
+class ProfileRows:
+    """
+    Renders ProfileSerializer output (optionally a `?fields=` subset) from
+    the dicts of `queryset.values(*rows.columns)`.
+    """
+
+    def __init__(self, fields=None, prefix=''):
+        from .models import Profile
+
+        self.fields= list(fields or ProfileSerializer.Meta.fields)
+        self.prefix= prefix
+
+        self.storage= Profile._meta.get_field('profile_img').storage
+        self.sources= [
+            (name, prefix + ProfileSerializer.COMPUTED_SOURCES.get(name, (name,))[0]) for name in self.fields
+        ]
+        self.columns= [prefix + column for column in ProfileSerializer.columns_for(self.fields)]
+
+    def values(self, queryset, *extra):
+        return queryset.values(*self.columns, *extra)
+
+    def render(self, rows):
+        converters= {
+            'last_active_at': _datetime(),
+            'last_seen_human': last_seen_human,
+            'profile_img': _image_url(self.storage),
+        }
+        # (output name, values() key, converter or None)
+        plan= [(name, source, converters.get(name)) for name, source in self.sources]
+
+        return [
+            {name: row[source] if convert is None else convert(row[source]) for name, source, convert in plan}
+            for row in rows
+        ]
+
+
+def follow_rows(relation):
+    """SimpleUserSerializer output for the `relation` side of Follow rows."""
+    return ProfileRows(SimpleUserSerializer.Meta.fields, prefix=f'{relation}__')
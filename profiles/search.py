@@ -0,0 +1,124 @@
+"""
+Full-text profile search on an SQLite FTS5 table.
+
+`profiles_profile_search` mirrors first_name / last_name / bio of every
+Profile (rowid = profile id) and carries is_private as an UNINDEXED column so
+private profiles are dropped inside the index query. The table is created by
+migration 0015 and kept in sync by the signal handlers in profiles.signals.
+"""
+import re
+
+from django.db import connection
+
+
+TABLE= 'profiles_profile_search'
+
+# bm25 column weights: names matter much more than bio text
+RANK= f'bm25({TABLE}, 10.0, 10.0, 1.0)'
+
+MAX_TERMS= 8
+
+
+def available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match(query):
+    """Turn free text into an FTS5 prefix query: `jo smi` -> `"jo"* "smi"*`"""
+    terms= re.findall(r'\w+', query or '')[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def index_profiles(profiles):
+    if not available():
+        return
+
+    rows= [
+        (p.pk, p.first_name or '', p.last_name or '', p.bio or '', int(p.is_private))
+        for p in profiles
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {TABLE} (rowid, first_name, last_name, bio, is_private) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+def remove_profiles(profile_ids):
+    if not available():
+        return
+
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {TABLE} WHERE rowid = %s', [(pk,) for pk in profile_ids])
+
+
+def rebuild(chunk_size=2000):
+    """Re-index every profile, chunk by chunk. Returns the number indexed."""
+    from .models import Profile
+
+    if not available():
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE}')
+
+    total= 0
+    last_pk= 0
+    fields= ('id', 'first_name', 'last_name', 'bio', 'is_private')
+
+    while True:
+        chunk= list(Profile.objects.filter(pk__gt=last_pk).order_by('pk').only(*fields)[:chunk_size])
+        if not chunk:
+            break
+
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {TABLE} (rowid, first_name, last_name, bio, is_private) VALUES (%s, %s, %s, %s, %s)',
+                [(p.pk, p.first_name or '', p.last_name or '', p.bio or '', int(p.is_private)) for p in chunk],
+            )
+        last_pk= chunk[-1].pk
+        total+= len(chunk)
+
+    return total
+
+
+def search(query, limit, after=None, ordering='relevance'):
+    """
+    Public profiles matching `query` as a list of (profile_id, sort_value).
+
+    Results are keyset paginated: pass the last (sort_value, profile_id) pair
+    of the previous page as `after`.
+    """
+    match= build_match(query)
+    if not match:
+        return []
+
+    if ordering == 'influence':
+        sql= (
+            f'SELECT p.id, p.influence_score FROM {TABLE} '
+            f'JOIN profiles_profile p ON p.id = {TABLE}.rowid '
+            f'WHERE {TABLE} MATCH %s AND {TABLE}.is_private = 0'
+        )
+        params= [match]
+        if after is not None:
+            sql+= ' AND (p.influence_score < %s OR (p.influence_score = %s AND p.id < %s))'
+            params+= [after[0], after[0], after[1]]
+        sql+= ' ORDER BY p.influence_score DESC, p.id DESC LIMIT %s'
+    else:
+        sql= (
+            f'SELECT id, score FROM ('
+            f'SELECT rowid AS id, {RANK} AS score FROM {TABLE} '
+            f'WHERE {TABLE} MATCH %s AND is_private = 0)'
+        )
+        params= [match]
+        if after is not None:
+            sql+= ' WHERE score > %s OR (score = %s AND id > %s)'
+            params+= [after[0], after[0], after[1]]
+        sql+= ' ORDER BY score, id LIMIT %s'
+
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
@@ -1,9 +1,17 @@
 from rest_framework import serializers
 
+from django.conf import settings
 from django.utils.timesince import timesince
 from .models import Profile, Follow
 
 
+def last_seen_human(last_active_at):
+    if last_active_at:
+        return timesince(last_active_at) + "ago"
+
+    return 'N/A'
+
+
 class ProfileSerializer(serializers.ModelSerializer):
     # profile_img= 
     last_seen_human = serializers.SerializerMethodField()
@@ -15,8 +23,52 @@ class ProfileSerializer(serializers.ModelSerializer):
             'link1_name', 'link1_url',
             'link2_name', 'link2_url',
             'link3_name', 'link3_url',
+            'followers_count', 'following_count',
         ]
+        read_only_fields= ['followers_count', 'following_count']
+
+    # Model columns behind the computed fields, for only()
+    COMPUTED_SOURCES= {
+        'last_seen_human': ('last_active_at',),
+    }
+
+    def __init__(self, *args, fields=None, **kwargs):
+        """`fields` keeps only the named output fields; the rest are never computed."""
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
 
+    @classmethod
+    def requested_fields(cls, request):
+        """
+        Parse `?fields=slug,first_name`. Returns None when the parameter is
+        absent, and rejects names the serializer does not have.
+        """
+        raw= request.query_params.get('fields')
+        if raw is None:
+            return None
+
+        fields= [name.strip() for name in raw.split(',') if name.strip()]
+        unknown= [name for name in fields if name not in cls.Meta.fields]
+        if unknown or not fields:
+            raise serializers.ValidationError({
+                'fields': f"Unknown fields: {', '.join(unknown)}" if unknown else "At least one field is required"
+            })
+
+        return fields
+
+    @classmethod
+    def columns_for(cls, fields):
+        """Model columns needed to render `fields`; pass them to only()."""
+        columns= []
+        for name in fields:
+            for column in cls.COMPUTED_SOURCES.get(name, (name,)):
+                if column not in columns:
+                    columns.append(column)
+
+        return columns
 
     
     def validate(self, data):
@@ -43,10 +95,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         return data
     
     def get_last_seen_human(self, obj):
-        if obj.last_active_at:
-            return timesince(obj.last_active_at) + "ago"
-        
-        return 'N/A'
+        return last_seen_human(obj.last_active_at)
     
 
 class FollowSerializer(serializers.ModelSerializer):
@@ -60,4 +109,13 @@ class FollowSerializer(serializers.ModelSerializer):
 class SimpleUserSerializer(serializers.ModelSerializer):
     class Meta:
         model= Profile
-        fields= ['first_name', 'last_name', 'slug']
\ No newline at end of file
+        fields= ['first_name', 'last_name', 'slug']
+
+
+class BulkFollowSerializer(serializers.Serializer):
+    slugs= serializers.ListField(
+        child=serializers.SlugField(),
+        allow_empty=False,
+        max_length=settings.BULK_FOLLOW_MAX_SLUGS,
+    )
+    action= serializers.ChoiceField(choices=['follow', 'unfollow'], default='follow')
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import Profile, Follow
+from . import search
+from .autocomplete import index as autocomplete_index
+from .cache import bump_profile_versions, forget_slug
+
+
+# Columns each derived structure is built from
+SEARCH_FIELDS= {'first_name', 'last_name', 'bio', 'is_private'}
+AUTOCOMPLETE_FIELDS= {'slug', 'first_name', 'last_name', 'followers_count', 'last_active_at', 'is_private'}
+
+
+def touches(update_fields, fields):
+    return update_fields is None or not fields.isdisjoint(update_fields)
+
+
+@receiver(post_save, sender=Profile)
+def index_profile(sender, instance, created, update_fields=None, **kwargs):
+    pk= instance.pk
+    old_slug= None
+    if not created and touches(update_fields, {'slug'}) and instance.initial_value('slug') != instance.slug:
+        old_slug= instance.initial_value('slug')
+
+    def invalidate():
+        bump_profile_versions([pk])
+        if old_slug:
+            forget_slug(old_slug)
+
+    transaction.on_commit(invalidate)
+
+    if touches(update_fields, SEARCH_FIELDS):
+        search.index_profiles([instance])
+
+    if autocomplete_index.built_at is not None and touches(update_fields, AUTOCOMPLETE_FIELDS):
+        autocomplete_index.update(instance)
+
+
+@receiver(pre_delete, sender=Profile)
+def release_follow_counts(sender, instance, **kwargs):
+    Follow.objects.detach(instance.pk)
+
+
+@receiver(post_delete, sender=Profile)
+def unindex_profile(sender, instance, **kwargs):
+    pk, slug= instance.pk, instance.slug
+    transaction.on_commit(lambda: (bump_profile_versions([pk]), forget_slug(slug)))
+
+    search.remove_profiles([instance.pk])
+
+    if autocomplete_index.built_at is not None:
+        autocomplete_index.remove(instance.pk)
@@ -1,3 +1,760 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import UserRegisters
+from accounts.tokens import ProfileRefreshToken
+from . import autocomplete, data_export, graph, presence
+from .management.commands import compute_influence
+from .models import Profile, Follow, DataExport
+from .presence import tracker
+from .rendering import ProfileRows, follow_rows
+from .serializers import ProfileSerializer, SimpleUserSerializer
+
+
+def make_profile(i, first_name='John', last_name='Smith', is_private=False):
+    user= UserRegisters.objects.create_user(email=f'user{i}@example.com', password=None, is_verified=True)
+    profile= Profile.objects.create(user=user, first_name=first_name, last_name=last_name, is_private=is_private)
+    return user, profile
+
+
+def client_for(user):
+    client= APIClient()
+    client.credentials(HTTP_AUTHORIZATION='Bearer ' + str(ProfileRefreshToken.for_user(user).access_token))
+    return client
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        autocomplete.index.built_at= None
+
+    def complete(self, client, q):
+        return [row['slug'] for row in client.get(f'/api/users/autocomplete/?q={q}').data]
+
+    def test_warm_builds_in_background_once(self):
+        with mock.patch.object(autocomplete._warmup, 'start') as start:
+            autocomplete.warm()
+            start.assert_called_once_with()
+
+            autocomplete.get_index()
+            autocomplete.warm()
+            start.assert_called_once_with()
+
+    def test_private_profiles_are_not_indexed(self):
+        user, _= make_profile(0, first_name='Alice')
+        _, public= make_profile(1, first_name='Joan')
+        make_profile(2, first_name='Jodie', is_private=True)
+
+        self.assertEqual(self.complete(client_for(user), 'jo'), [public.slug])
+
+    def test_profile_leaves_index_when_made_private(self):
+        user, _= make_profile(0, first_name='Alice')
+        _, profile= make_profile(1, first_name='Joan')
+        client= client_for(user)
+        self.assertEqual(self.complete(client, 'jo'), [profile.slug])
+
+        profile.is_private= True
+        profile.save()
+        self.assertEqual(self.complete(client, 'jo'), [])
+
+        profile.is_private= False
+        profile.save()
+        self.assertEqual(self.complete(client, 'jo'), [profile.slug])
+
+
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tracker._pending.clear()
+        tracker._last_recorded.clear()
+        self.viewer, _= make_profile(0)
+        self.owner, self.profile= make_profile(1)
+        self.client= client_for(self.viewer)
+
+    def detail(self):
+        return self.client.get(f'/api/users/{self.profile.slug}/')
+
+    def test_presence_flush_refreshes_cached_page(self):
+        first= self.detail()
+
+        tracker.record(self.owner.id, timezone.now() + timedelta(hours=1))
+        tracker.flush()
+
+        second= self.detail()
+        self.assertNotEqual(first.data['last_active_at'], second.data['last_active_at'])
+        self.assertNotEqual(first['ETag'], second['ETag'])
+
+    def test_reconciled_counters_refresh_cached_page(self):
+        Profile.objects.filter(pk=self.profile.pk).update(followers_count=7)
+        self.assertEqual(self.detail().data['followers_count'], 7)
+
+        call_command('reconcile_follow_counts', stdout=StringIO())
+        self.assertEqual(self.detail().data['followers_count'], 0)
+
+    def test_etag_describes_the_cached_body(self):
+        first= self.detail()
+        # Written behind the cache's back: the cached page is now stale
+        Profile.objects.filter(pk=self.profile.pk).update(followers_count=7)
+
+        second= self.detail()
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        cache.clear()
+        third= self.detail()
+        self.assertEqual(third.data['followers_count'], 7)
+        self.assertNotEqual(third['ETag'], first['ETag'])
+
+    def test_second_read_is_served_from_cache(self):
+        self.detail()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.detail().status_code, 200)
+
+    def test_renamed_slug_is_forgotten(self):
+        old_slug= self.profile.slug
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.slug= 'renamed'
+            self.profile.save()
+
+        self.assertEqual(self.client.get(f'/api/users/{old_slug}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/users/renamed/').data['slug'], 'renamed')
+
+
+class FollowListConditionalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.viewer, _= make_profile(0)
+        _, self.target= make_profile(1)
+        self.followers= [make_profile(i)[0] for i in range(2, 5)]
+        for user in self.followers:
+            client_for(user).put(f'/api/users/follow/{self.target.slug}/')
+
+        # Back-date everything so the unfollow below lands in a later second
+        day_ago= timezone.now() - timedelta(days=1)
+        Follow.objects.update(created_at=day_ago)
+        Profile.objects.update(updated_at=day_ago)
+
+        self.client= client_for(self.viewer)
+        self.url= f'/api/users/follow/{self.target.slug}/followers/'
+
+    def test_unchanged_list_is_not_modified(self):
+        first= self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']).status_code, 304)
+
+    def test_unfollow_of_older_follower_changes_list(self):
+        first= self.client.get(self.url)
+        self.assertEqual(len(first.data['results']), 3)
+
+        client_for(self.followers[0]).delete(f'/api/users/follow/{self.target.slug}/')
+
+        by_date= self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(by_date.status_code, 200)
+        self.assertEqual(len(by_date.data['results']), 2)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+
+class PrivateProfileTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner, self.profile= make_profile(0, is_private=True)
+        self.other, _= make_profile(1)
+
+    def test_owner_sees_own_private_profile(self):
+        response= client_for(self.owner).get(f'/api/users/{self.profile.slug}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['slug'], self.profile.slug)
+        self.assertIn('ETag', response)
+
+    def test_others_are_refused(self):
+        response= client_for(self.other).get(f'/api/users/{self.profile.slug}/')
+        self.assertEqual(response.data, {'status': 403, 'message': 'This Profile is Private'})
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.viewer, _= make_profile(0)
+        for i in range(1, 7):
+            make_profile(i)
+        self.client= client_for(self.viewer)
+
+    def walk(self, url):
+        """Follow `next` links to the end; returns (slugs, pages)."""
+        pages= [self.client.get(url).data]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).data)
+        return [row['slug'] for page in pages for row in page['results']], pages
+
+    def test_next_and_previous(self):
+        slugs, pages= self.walk('/api/users/?page_size=3')
+        self.assertEqual(slugs, list(Profile.objects.order_by('id').values_list('slug', flat=True)))
+        self.assertIsNone(pages[0]['previous'])
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+
+        previous= self.client.get(pages[2]['previous']).data
+        self.assertEqual([row['slug'] for row in previous['results']], slugs[3:6])
+        self.assertEqual([row['slug'] for row in self.client.get(previous['next']).data['results']], slugs[6:])
+
+    def test_ties_are_broken_by_id(self):
+        # Every influence_score is 0, so only the trailing id orders the pages
+        slugs, _= self.walk('/api/users/?ordering=influence&page_size=2')
+        self.assertEqual(slugs, list(Profile.objects.order_by('-id').values_list('slug', flat=True)))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/users/?cursor=garbage').status_code, 404)
+
+
+class PresenceTests(TestCase):
+    def setUp(self):
+        tracker._pending.clear()
+        tracker._last_recorded.clear()
+        self.user, self.profile= make_profile(0)
+        Profile.objects.filter(pk=self.profile.pk).update(last_active_at=timezone.now() - timedelta(days=3))
+
+    def test_requests_are_merged_into_one_write(self):
+        client= client_for(self.user)
+        for _ in range(5):
+            client.get('/api/me/')
+        self.assertEqual(list(tracker._pending), [self.user.id])
+
+        self.assertEqual(tracker.flush(), 1)
+        self.profile.refresh_from_db()
+        self.assertGreater(self.profile.last_active_at, timezone.now() - timedelta(minutes=1))
+
+    def test_flush_without_pending_writes_nothing(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(tracker.flush(), 0)
+
+    def test_exit_flush_is_quiet_without_database(self):
+        tracker.record(self.user.id)
+        with mock.patch.object(tracker, 'flush', side_effect=DatabaseError('no such table')), \
+                self.assertNoLogs('profiles.presence', level='WARNING'):
+            presence._flush_on_exit()
+
+    def test_exit_flush_skips_empty_buffer(self):
+        with mock.patch.object(tracker, 'flush') as flush:
+            presence._flush_on_exit()
+        flush.assert_not_called()
+
+
+class FollowCounterTests(TestCase):
+    def setUp(self):
+        self.user, self.profile= make_profile(0)
+        _, self.other= make_profile(1)
+
+    def counts(self):
+        self.profile.refresh_from_db()
+        self.other.refresh_from_db()
+        return self.profile.following_count, self.other.followers_count
+
+    def test_follow_updates_counters(self):
+        client_for(self.user).post(f'/api/users/follow/{self.other.slug}/')
+        self.assertEqual(self.counts(), (1, 1))
+
+    def test_reconcile_fixes_drift(self):
+        Follow.objects.follow(self.profile.pk, self.other.pk)
+        Profile.objects.update(followers_count=9, following_count=9)
+
+        out= StringIO()
+        call_command('reconcile_follow_counts', batch_size=1, dry_run=True, stdout=out)
+        self.assertIn('drifted 2', out.getvalue())
+        self.assertEqual(self.counts(), (9, 9))
+
+        call_command('reconcile_follow_counts', batch_size=1, stdout=StringIO())
+        self.assertEqual(self.counts(), (1, 1))
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).followers_count, 0)
+
+    def test_deleting_a_profile_releases_its_follows(self):
+        _, fan= make_profile(2)
+        Follow.objects.follow(self.profile.pk, self.other.pk)
+        Follow.objects.follow(fan.pk, self.profile.pk)
+
+        self.profile.delete()
+        self.other.refresh_from_db()
+        fan.refresh_from_db()
+        self.assertEqual((self.other.followers_count, fan.following_count), (0, 0))
+
+    def test_deleting_a_user_releases_its_follows(self):
+        Follow.objects.follow(self.profile.pk, self.other.pk)
+
+        self.user.delete()
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.followers_count, 0)
+
+
+class FollowListPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.profile= make_profile(0)
+        self.others= [make_profile(i)[1] for i in range(1, 6)]
+        for other in self.others:
+            Follow.objects.create(follower=other, following=self.profile)
+            Follow.objects.create(follower=self.profile, following=other)
+        self.client= client_for(self.user)
+
+    def test_newest_first_across_pages(self):
+        newest_first= [other.slug for other in reversed(self.others)]
+        for kind in ('followers', 'following'):
+            page= self.client.get(f'/api/users/follow/{self.profile.slug}/{kind}/?page_size=2').data
+            slugs= [row['slug'] for row in page['results']]
+            while page['next']:
+                page= self.client.get(page['next']).data
+                slugs+= [row['slug'] for row in page['results']]
+            self.assertEqual(slugs, newest_first, kind)
+
+    def test_unknown_profile(self):
+        self.assertEqual(self.client.get('/api/users/follow/nobody/followers/').status_code, 404)
+
+
+class IdempotentFollowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.profile= make_profile(0)
+        _, self.other= make_profile(1)
+        self.client= client_for(self.user)
+        self.url= f'/api/users/follow/{self.other.slug}/'
+
+    def counts(self):
+        self.profile.refresh_from_db()
+        self.other.refresh_from_db()
+        return self.profile.following_count, self.other.followers_count
+
+    def test_repeated_put_follows_once(self):
+        for _ in range(3):
+            response= self.client.put(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.data['data']['is_following'])
+
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.counts(), (1, 1))
+
+    def test_repeated_delete_unfollows_once(self):
+        self.client.put(self.url)
+        for _ in range(2):
+            response= self.client.delete(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.data['data']['is_following'])
+
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_cannot_follow_self(self):
+        self.assertEqual(self.client.put(f'/api/users/follow/{self.profile.slug}/').status_code, 400)
+        self.assertEqual(self.counts(), (0, 0))
+
+
+class BulkFollowTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.profile= make_profile(0)
+        self.others= [make_profile(i)[1] for i in range(1, 4)]
+        self.client= client_for(self.user)
+
+    def bulk(self, slugs, action=None):
+        body= {'slugs': slugs}
+        if action:
+            body['action']= action
+        return self.client.post('/api/users/follow/bulk/', body, format='json')
+
+    def test_follow_reports_per_slug_outcome(self):
+        first, second, third= self.others
+        Follow.objects.follow(self.profile.pk, first.pk)
+
+        response= self.bulk([first.slug, second.slug, third.slug, 'nobody', self.profile.slug])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data'], {
+            first.slug: 'already_following',
+            second.slug: 'followed',
+            third.slug: 'followed',
+            'nobody': 'not_found',
+            self.profile.slug: 'self',
+        })
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.following_count, 3)
+
+    def test_unfollow(self):
+        first= self.others[0]
+        self.bulk([first.slug])
+
+        response= self.bulk([first.slug, first.slug], action='unfollow')
+        self.assertEqual(response.data['data'], {first.slug: 'unfollowed'})
+        first.refresh_from_db()
+        self.assertEqual(first.followers_count, 0)
+
+    def test_counters_are_incremented_not_recounted(self):
+        slugs= [other.slug for other in self.others]
+        with CaptureQueriesContext(connection) as queries:
+            self.bulk(slugs)
+        self.assertFalse([query['sql'] for query in queries if 'COUNT(' in query['sql']])
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.following_count, 3)
+        self.assertEqual(sorted(Profile.objects.filter(slug__in=slugs).values_list('followers_count', flat=True)), [1, 1, 1])
+
+        self.bulk(slugs, action='unfollow')
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.following_count, 0)
+        self.assertEqual(sorted(Profile.objects.filter(slug__in=slugs).values_list('followers_count', flat=True)), [0, 0, 0])
+
+
+class RelationshipStatusTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.profile= make_profile(0)
+        _, self.followed= make_profile(1)
+        _, self.fan= make_profile(2)
+        Follow.objects.follow(self.profile.pk, self.followed.pk)
+        Follow.objects.follow(self.fan.pk, self.profile.pk)
+        self.client= client_for(self.user)
+        self.url= f'/api/users/relationships/?slugs={self.followed.slug},{self.fan.slug},nobody'
+
+    def test_status_per_slug(self):
+        data= self.client.get(self.url).data['data']
+        self.assertEqual(data, {
+            self.followed.slug: {'following': True, 'followed_by': False},
+            self.fan.slug: {'following': False, 'followed_by': True},
+            'nobody': None,
+        })
+
+    def test_cached_answer_follows_writes(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Follow.objects.follow(self.profile.pk, self.fan.pk)
+
+        data= self.client.get(self.url).data['data']
+        self.assertEqual(data[self.fan.slug], {'following': True, 'followed_by': True})
+
+    def test_invalid_slugs_rejected(self):
+        for bad in ['a b', 'a:b', 'x' * 51, 'caf%C3%A9']:
+            response= self.client.get(f'/api/users/relationships/?slugs={self.followed.slug},{bad}')
+            self.assertEqual(response.status_code, 400, bad)
+
+
+class SuggestionTests(TestCase):
+    def setUp(self):
+        graph._graph= None
+        self.user, self.profile= make_profile(0)
+
+    def test_friends_of_friends_first(self):
+        a, b, c, d, e= [make_profile(i)[1] for i in range(1, 6)]
+        e.is_private= True
+        e.save()
+        for follower, following in [
+            (self.profile, a), (self.profile, b), (a, c), (b, c), (a, d), (b, e), (d, self.profile),
+        ]:
+            Follow.objects.follow(follower.pk, following.pk)
+
+        slugs= [row['slug'] for row in client_for(self.user).get('/api/users/suggestions/').data['data']]
+        # d also follows the viewer, c is reached through two friends
+        self.assertEqual(slugs, [d.slug, c.slug])
+
+    def test_followed_since_snapshot_not_suggested(self):
+        a, b= [make_profile(i)[1] for i in range(1, 3)]
+        Follow.objects.follow(self.profile.pk, a.pk)
+        Follow.objects.follow(a.pk, b.pk)
+        client= client_for(self.user)
+        self.assertEqual([row['slug'] for row in client.get('/api/users/suggestions/').data['data']], [b.slug])
+
+        client.put(f'/api/users/follow/{b.slug}/')
+        self.assertEqual(client.get('/api/users/suggestions/').data['data'], [])
+
+
+class InfluenceTests(TestCase):
+    def test_most_followed_profile_ranks_first(self):
+        users= [make_profile(i) for i in range(5)]
+        hub= users[3][1]
+        for _, profile in users:
+            if profile != hub:
+                Follow.objects.follow(profile.pk, hub.pk)
+
+        call_command('compute_influence', chunk_size=2, batch_size=2, stdout=StringIO())
+
+        scores= dict(Profile.objects.values_list('pk', 'influence_score'))
+        self.assertAlmostEqual(sum(scores.values()), len(users), places=3)
+        self.assertEqual(max(scores, key=scores.get), hub.pk)
+
+        response= client_for(users[0][0]).get('/api/users/?ordering=influence&page_size=1')
+        self.assertEqual(response.data['results'][0]['slug'], hub.slug)
+
+    def test_follows_to_profiles_created_mid_run_are_skipped(self):
+        users= [make_profile(i) for i in range(3)]
+        Follow.objects.follow(users[0][1].pk, users[1][1].pk)
+        load_edges= compute_influence.Command.load_edges
+
+        def late_signup(command, np, ids, chunk_size):
+            _, newcomer= make_profile(9)
+            Follow.objects.follow(users[2][1].pk, newcomer.pk)
+            Follow.objects.follow(newcomer.pk, users[1][1].pk)
+            return load_edges(command, np, ids, chunk_size)
+
+        with mock.patch.object(compute_influence.Command, 'load_edges', late_signup):
+            out= StringIO()
+            call_command('compute_influence', stdout=out)
+
+        self.assertIn('3 profiles, 1 edges', out.getvalue())
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user, self.profile= make_profile(0, first_name='Alice', last_name='Wonder')
+        for i in range(1, 6):
+            make_profile(i, last_name=f'Smith{i}')
+        make_profile(9, first_name='Johnny', last_name='Secret', is_private=True)
+        self.client= client_for(self.user)
+
+    def search(self, q):
+        return [row['slug'] for row in self.client.get(f'/api/users/search/?q={q}').data['results']]
+
+    def test_prefix_terms_and_paging(self):
+        page= self.client.get('/api/users/search/?q=jo smi&page_size=2').data
+        slugs= [row['slug'] for row in page['results']]
+        while page['next']:
+            page= self.client.get(page['next']).data
+            slugs+= [row['slug'] for row in page['results']]
+        self.assertEqual(len(slugs), 5)
+        self.assertEqual(len(set(slugs)), 5)
+
+    def test_private_profiles_are_not_found(self):
+        self.assertEqual(self.search('johnny'), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.profile.first_name= 'Zed'
+        self.profile.save()
+        self.assertEqual(self.search('zed'), [self.profile.slug])
+
+        self.profile.delete()
+        self.assertEqual(self.search('zed'), [])
+
+
+class SlugTests(TestCase):
+    def test_sequential_slugs(self):
+        slugs= [make_profile(i)[1].slug for i in range(3)]
+        self.assertEqual(slugs, ['john-smith', 'john-smith-1', 'john-smith-2'])
+        self.assertEqual(Profile.objects.next_slug('john-smith'), 'john-smith-3')
+
+    def test_longer_slug_with_same_prefix_is_ignored(self):
+        make_profile(0)
+        make_profile(1, last_name='Smith-Jr')
+        self.assertEqual(Profile.objects.next_slug('john-smith'), 'john-smith-1')
+
+    def test_bulk_create_profiles(self):
+        make_profile(0)
+        users= [UserRegisters.objects.create_user(email=f'bulk{i}@example.com', password=None) for i in range(3)]
+        created= Profile.objects.bulk_create_profiles([
+            Profile(user=users[0], first_name='John', last_name='Smith'),
+            Profile(user=users[1], first_name='Ann', last_name='Lee'),
+            Profile(user=users[2], first_name='John', last_name='Smith'),
+        ])
+        self.assertEqual([profile.slug for profile in created], ['john-smith-1', 'ann-lee', 'john-smith-2'])
+
+    def test_lost_race_retries_with_a_new_slug(self):
+        make_profile(0)
+        make_profile(1)
+        user= UserRegisters.objects.create_user(email='race@example.com', password=None)
+
+        next_slug= Profile.objects.next_slug
+        calls= []
+
+        def stale(base_slug):
+            calls.append(base_slug)
+            return 'john-smith-1' if len(calls) == 1 else next_slug(base_slug)
+
+        with mock.patch.object(type(Profile.objects), 'next_slug', side_effect=stale):
+            profile= Profile.objects.create(user=user, first_name='John', last_name='Smith')
+        self.assertEqual(profile.slug, 'john-smith-2')
+
+
+class ProfileExportTests(TestCase):
+    def setUp(self):
+        self.user, self.profile= make_profile(0)
+        for i in range(1, 5):
+            make_profile(i)
+        self.client= client_for(self.user)
+
+    def test_staff_only(self):
+        self.assertEqual(self.client.get('/api/users/export/').status_code, 403)
+
+    def test_ndjson_and_gzipped_csv(self):
+        self.user.is_staff= True
+        self.user.save()
+
+        response= self.client.get('/api/users/export/')
+        self.assertEqual(response.status_code, 200)
+        lines= b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(json.loads(lines[0])['slug'], self.profile.slug)
+
+        response= self.client.get('/api/users/export/?output=csv&gzip=1')
+        rows= list(csv.reader(StringIO(gzip.decompress(b''.join(response.streaming_content)).decode())))
+        self.assertEqual(rows[0][0], 'id')
+        self.assertEqual(len(rows), 6)
+
+
+class DataExportTests(TestCase):
+    def setUp(self):
+        media_root= tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media= override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+        self.user, self.profile= make_profile(0)
+        others= [make_profile(i)[1] for i in range(1, 4)]
+        for other in others:
+            Follow.objects.follow(other.pk, self.profile.pk)
+        Follow.objects.follow(self.profile.pk, others[0].pk)
+        self.client= client_for(self.user)
+
+    def export(self):
+        # Run the worker inline, on the test's connection
+        with mock.patch.object(data_export._executor, 'submit', side_effect=lambda fn, *args: fn(*args)), \
+                mock.patch.object(data_export, 'close_old_connections'), \
+                mock.patch.object(data_export.connections, 'close_all'), \
+                self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/me/export/')
+
+    def test_nothing_requested(self):
+        self.assertEqual(self.client.get('/api/me/export/').status_code, 404)
+
+    def test_archive(self):
+        self.assertEqual(self.export().status_code, 202)
+
+        data= self.client.get('/api/me/export/').data['data']
+        self.assertEqual(data['status'], 'done')
+        self.assertEqual(client_for(make_profile(9)[0]).get(data['download_url']).status_code, 404)
+
+        response= self.client.get(data['download_url'])
+        archive= zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(
+            sorted(archive.namelist()),
+            ['account.json', 'followers.ndjson', 'following.ndjson', 'profile.json'],
+        )
+        self.assertEqual(len(archive.read('followers.ndjson').splitlines()), 3)
+        self.assertEqual(len(archive.read('following.ndjson').splitlines()), 1)
+        self.assertEqual(json.loads(archive.read('account.json'))['email'], self.user.email)
+
+    def test_lost_export_times_out(self):
+        lost= DataExport.objects.create(user=self.user, status=DataExport.RUNNING)
+        self.assertEqual(self.client.post('/api/me/export/').data['data']['id'], lost.pk)
+
+        DataExport.objects.filter(pk=lost.pk).update(created_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(self.client.get('/api/me/export/').data['data']['status'], 'failed')
+
+        self.assertEqual(self.export().status_code, 202)
+        data= self.client.get('/api/me/export/').data['data']
+        self.assertNotEqual(data['id'], lost.pk)
+        self.assertEqual(data['status'], 'done')
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user, self.profile= make_profile(0)
+        _, self.other= make_profile(1, first_name='Bob')
+        self.client= client_for(self.user)
+
+    def test_list_returns_only_requested_fields(self):
+        page= self.client.get('/api/users/?fields=slug,first_name&page_size=1').data
+        self.assertEqual(set(page['results'][0]), {'slug', 'first_name'})
+        self.assertEqual(set(self.client.get(page['next']).data['results'][0]), {'slug', 'first_name'})
+
+    def test_detail_and_own_profile(self):
+        data= self.client.get(f'/api/users/{self.other.slug}/?fields=slug,last_seen_human').data
+        self.assertEqual(set(data), {'slug', 'last_seen_human'})
+        self.assertEqual(list(self.client.get('/api/me/?fields=bio').data['data']), ['bio'])
+
+    def test_search(self):
+        data= self.client.get('/api/users/search/?q=bob&fields=slug').data
+        self.assertEqual(data['results'], [{'slug': self.other.slug}])
+
+    def test_unknown_or_empty_fields_are_rejected(self):
+        for url in ('/api/me/?fields=nope', '/api/users/?fields=', f'/api/users/{self.other.slug}/?fields=slug,password'):
+            self.assertEqual(self.client.get(url).status_code, 400, url)
+
+
+class RenderingTests(TestCase):
+    def setUp(self):
+        self.user, self.profile= make_profile(0)
+        for i in range(1, 4):
+            _, other= make_profile(i)
+            Follow.objects.follow(other.pk, self.profile.pk)
+        Profile.objects.filter(pk=self.profile.pk).update(
+            last_active_at=timezone.now() - timedelta(days=3), bio='Hello', link1_name='Site', link1_url='https://example.com',
+        )
+
+    def test_profile_rows_match_serializer(self):
+        profiles= Profile.objects.order_by('id')
+        rows= ProfileRows()
+        self.assertEqual(rows.render(rows.values(profiles)), [dict(row) for row in ProfileSerializer(profiles, many=True).data])
+
+    def test_sparse_profile_rows_match_serializer(self):
+        fields= ['slug', 'last_seen_human']
+        profiles= Profile.objects.order_by('id')
+        rows= ProfileRows(fields)
+        self.assertEqual(
+            rows.render(rows.values(profiles)),
+            [dict(row) for row in ProfileSerializer(profiles, many=True, fields=fields).data],
+        )
+
+    def test_follow_rows_match_serializer(self):
+        follows= Follow.objects.filter(following=self.profile).order_by('-created_at', '-id')
+        rows= follow_rows('follower')
+        expected= SimpleUserSerializer([follow.follower for follow in follows.select_related('follower')], many=True).data
+        self.assertEqual(rows.render(rows.values(follows)), [dict(row) for row in expected])
+
+
+class DirtyFieldsTests(TestCase):
+    def setUp(self):
+        self.user, profile= make_profile(0)
+        # Loaded from the database, so the initial values come from from_db()
+        self.profile= Profile.objects.get(pk=profile.pk)
+
+    def test_unchanged_save_issues_no_query(self):
+        self.assertEqual(self.profile.get_dirty_fields(), [])
+        with self.assertNumQueries(0):
+            self.profile.save()
+
+    def test_save_writes_only_changed_columns(self):
+        self.profile.bio= 'Hello'
+        self.assertEqual(self.profile.get_dirty_fields(), ['bio'])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.profile.save()
+        updates= [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"bio"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"first_name"', updates[0])
+        self.assertEqual(self.profile.get_dirty_fields(), [])
+
+    def test_deferred_fields_are_not_dirty(self):
+        profile= Profile.objects.only('id', 'slug').get(pk=self.profile.pk)
+        profile.bio
+        self.assertEqual(profile.get_dirty_fields(), [])
+        profile.bio= 'Hello'
+        self.assertEqual(profile.get_dirty_fields(), ['bio'])
+
+    def test_noop_update_does_not_write(self):
+        updated_at= self.profile.updated_at
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response= client_for(self.user).put('/api/me/', {'first_name': 'John'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(Profile.objects.get(pk=self.profile.pk).updated_at, updated_at)
@@ -1,11 +1,19 @@
 from django.urls import path
 
-from .views import UserProfiles, UserProfileDetails, ownProfileView, FollowUnfollowView, FollowerList, FollowingList
+from .views import UserProfiles, UserProfileDetails, ownProfileView, FollowUnfollowView, FollowerList, FollowingList, BulkFollowView, RelationshipStatusView, SuggestionsView, ProfileSearchView, ProfileAutocompleteView, ProfileExportView, DataExportView, DataExportDownloadView
 
 urlpatterns = [
     path('users/', UserProfiles.as_view()),
+    path('users/relationships/', RelationshipStatusView.as_view()),
+    path('users/suggestions/', SuggestionsView.as_view()),
+    path('users/search/', ProfileSearchView.as_view()),
+    path('users/autocomplete/', ProfileAutocompleteView.as_view()),
+    path('users/export/', ProfileExportView.as_view()),
     path('users/<slug:slug>/', UserProfileDetails.as_view()),
     path("me/", ownProfileView.as_view(), name=""),
+    path('me/export/', DataExportView.as_view()),
+    path('me/export/<int:pk>/download/', DataExportDownloadView.as_view()),
+    path('users/follow/bulk/', BulkFollowView.as_view()),
     path('users/follow/<slug:slug>/', FollowUnfollowView.as_view()),
     path('users/follow/<slug:slug>/following/', FollowingList.as_view()),
     path('users/follow/<slug:slug>/followers/', FollowerList.as_view()),
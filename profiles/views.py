@@ -1,13 +1,29 @@
 from django.shortcuts import render
 from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.http import StreamingHttpResponse, FileResponse, Http404
+from django.db.models import Exists, OuterRef, Q
+from django.core.validators import slug_re
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from .models import Profile, Follow
-from .serializers import ProfileSerializer, FollowSerializer, SimpleUserSerializer
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import replace_query_param
+from .models import Profile, Follow, DataExport
+from .serializers import ProfileSerializer, FollowSerializer, SimpleUserSerializer, BulkFollowSerializer, last_seen_human
+from .pagination import KeysetPagination, encode_cursor, decode_cursor
+from . import search
+from .cache import get_relationships, set_relationships, resolve_slug, profile_entry, forget_slug
+from .graph import get_graph
+from .autocomplete import get_index as get_autocomplete_index
+from .export import export_stream
+from .data_export import start_export, expire_stale
+from .rendering import ProfileRows, follow_rows
+from .conditional import conditional, own_profile_validator, profile_validator, followers_validator, following_validator
 
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from accounts.authentication import ClaimsJWTAuthentication
 
 from django.contrib.auth import get_user_model
 
@@ -17,21 +33,59 @@ from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiRespon
 
 # Create your views here.
 
+def sparse_profiles(queryset, fields, *extra):
+    """Narrow `queryset` to the columns the requested `?fields=` need."""
+    if fields is None:
+        return queryset
+
+    return queryset.only(*ProfileSerializer.columns_for(fields), *extra)
+
+
+def own_profile(request):
+    """
+    The caller's profile as an (id, slug) stub built from the token claims.
+    Tokens without a slug claim cost one query.
+    """
+    profile_id= request.user.profile_id
+    if profile_id is None:
+        raise Http404
+
+    if request.user.slug is None:
+        return get_object_or_404(Profile.objects.only('id', 'slug'), pk=profile_id)
+    return Profile(id=profile_id, slug=request.user.slug)
+
+
 @extend_schema(
     summary= 'Get All User Profiles',
-    description= "Returns a list of all user profiles",
+    description= "Returns one page of user profiles. Follow the `next` / `previous` cursors to move between pages.",
+    parameters=[
+        OpenApiParameter("cursor", str, description="Opaque page cursor"),
+        OpenApiParameter("page_size", int, description="Profiles per page"),
+        OpenApiParameter("ordering", str, enum=['id', 'influence'], description="`influence` lists the most influential profiles first"),
+        OpenApiParameter("fields", str, description="Comma separated subset of fields to return, e.g. `slug,first_name,last_name`"),
+    ],
     responses=ProfileSerializer(many=True)
 )
 class UserProfiles(APIView):
 
     permission_classes= [IsAuthenticated]
-    authentication_classes= [JWTAuthentication]
+    authentication_classes= [ClaimsJWTAuthentication]
+
+    orderings= {
+        'id': ('id',),
+        'influence': ('-influence_score', '-id'),
+    }
 
     def get(self, request):
-        profile= Profile.objects.all()
-        serializer= ProfileSerializer(profile, many=True)
+        ordering= self.orderings.get(request.query_params.get('ordering'), self.orderings['id'])
+        fields= ProfileSerializer.requested_fields(request)
+
+        rows= ProfileRows(fields)
+        profiles= rows.values(Profile.objects.all(), *[name.lstrip('-') for name in ordering])
+        paginator= KeysetPagination(ordering=ordering)
+        page= paginator.paginate_queryset(profiles, request, view=self)
 
-        return Response(serializer.data)
+        return paginator.get_paginated_response(rows.render(page))
     
 
     @extend_schema(
@@ -45,14 +99,14 @@ class UserProfiles(APIView):
     )
     def post(self, request):
         try:
-            if Profile.objects.filter(user= request.user).exists():
+            if Profile.objects.filter(user_id= request.user.id).exists():
                 return Response({
                     'status': 400,
                     'message': 'Profile Already Created!'
                 })
             serializer= ProfileSerializer(data= request.data)
             if serializer.is_valid():
-                serializer.save(user= request.user)
+                serializer.save(user_id= request.user.id)
                 return Response({
                     'status': 201,
                     'message': "Profile Created Successfully",
@@ -73,7 +127,10 @@ class UserProfiles(APIView):
 @extend_schema(
     summary="Get a Single User Profile",
     description="Retrieve a user's profile using slug. If profile is private, only the owner can view.",
-    parameters=[OpenApiParameter("slug", str, description="Profile slug")],
+    parameters=[
+        OpenApiParameter("slug", str, description="Profile slug"),
+        OpenApiParameter("fields", str, description="Comma separated subset of fields to return, e.g. `slug,first_name,last_name`"),
+    ],
     responses={
         200: ProfileSerializer,
         403: OpenApiResponse(description="Profile is private"),
@@ -82,19 +139,44 @@ class UserProfiles(APIView):
 )
 class UserProfileDetails(APIView):
     permission_classes= [IsAuthenticated]
-    authentication_classes= [JWTAuthentication]
+    authentication_classes= [ClaimsJWTAuthentication]
+    def get_entry(self, slug):
+        entry= None
+        pk= resolve_slug(slug)
+        if pk is not None:
+            entry= profile_entry(pk)
+
+        # A renamed or deleted profile can leave a stale slug mapping behind
+        if pk is not None and (entry is None or entry['data']['slug'] != slug):
+            forget_slug(slug)
+            pk= resolve_slug(slug)
+            entry= profile_entry(pk) if pk is not None else None
+
+        if entry is None:
+            raise Http404
+        return entry
+
+    @conditional(profile_validator)
     def get(self, request, slug):
+        fields= ProfileSerializer.requested_fields(request)
         try:
-            profile= get_object_or_404(Profile, slug=slug)
+            entry= self.get_entry(slug)
 
-            if profile.is_private and profile.user != request.user:
+            if entry['is_private'] and entry['user_id'] != request.user.id:
                 return Response({
                     'status': 403,
                     'message': 'This Profile is Private'
                 })
             
-            serializer= ProfileSerializer(profile)
-            return Response(serializer.data)
+            data= dict(entry['data'])
+            if fields is not None:
+                data= {name: value for name, value in data.items() if name in fields}
+
+            if 'last_seen_human' in data:
+                data['last_seen_human']= last_seen_human(entry['last_active_at'])
+            return Response(data)
+        except Http404:
+            raise
         except Exception as e:
             return Response({
                     'status': 500,
@@ -141,7 +223,7 @@ class UserProfileDetails(APIView):
 
 class UpdateSocialLinks(APIView):
     permission_classes= [IsAuthenticated]
-    authentication_classes= [JWTAuthentication]
+    authentication_classes= [ClaimsJWTAuthentication]
 
 
     @extend_schema(
@@ -172,7 +254,7 @@ class UpdateSocialLinks(APIView):
         ]
     )
     def put(self, request):
-        profile= Profile.objects.get(user= request.user)
+        profile= Profile.objects.get(user_id= request.user.id)
 
         allowed_fields= [
             'link1_name', 'link1_url',
@@ -201,6 +283,9 @@ class UpdateSocialLinks(APIView):
 @extend_schema(
     summary="Get or Update Own Profile",
     description="Retrieve or update the profile of the currently logged-in user.",
+    parameters=[
+        OpenApiParameter("fields", str, description="Comma separated subset of fields to return, e.g. `slug,first_name,last_name`"),
+    ],
     responses={
         200: ProfileSerializer,
         400: OpenApiResponse(description="Validation error"),
@@ -226,12 +311,14 @@ class UpdateSocialLinks(APIView):
 class ownProfileView(APIView):
 
     permission_classes= [IsAuthenticated]
-    authentication_classes= [JWTAuthentication]
+    authentication_classes= [ClaimsJWTAuthentication]
 
+    @conditional(own_profile_validator)
     def get(self, request):
+        fields= ProfileSerializer.requested_fields(request)
         try:
-            profile= get_object_or_404(Profile, user= request.user)
-            serializer= ProfileSerializer(profile)
+            profile= get_object_or_404(sparse_profiles(Profile.objects.all(), fields), user_id= request.user.id)
+            serializer= ProfileSerializer(profile, fields=fields)
 
             return Response({
                 'status': 200,
@@ -248,7 +335,7 @@ class ownProfileView(APIView):
         
     def put(self, request):
         try: 
-            profile= get_object_or_404(Profile, user= request.user)
+            profile= get_object_or_404(Profile, user_id= request.user.id)
             serializer= ProfileSerializer(profile, data=request.data, partial= True)
 
             if serializer.is_valid():
@@ -278,7 +365,8 @@ class ownProfileView(APIView):
 """ follow unfollow  """
 @extend_schema(
     summary="Follow or Unfollow a user",
-    description="Follow a user by their profile slug. If already following, it will unfollow.",
+    description="Follow a user by their profile slug. If already following, it will unfollow. "
+                "Prefer PUT (follow) and DELETE (unfollow), which are idempotent and safe to retry.",
     parameters=[OpenApiParameter(name="slug", type=str, description="Target user profile slug", required=True)],
     request=OpenApiTypes.NONE,  # POST body is empty
     responses={
@@ -308,81 +396,586 @@ class ownProfileView(APIView):
 )
 class FollowUnfollowView(APIView):
     permission_classes= [IsAuthenticated]
-    authentication_classes= [JWTAuthentication]
+    authentication_classes= [ClaimsJWTAuthentication]
+
+    def get_profiles(self, request, slug):
+        my_profile= own_profile(request)
+        target_id= resolve_slug(slug)
+        if target_id is None:
+            raise Http404
+
+        # Only the id and slug of the target are ever used
+        target_user= Profile(id=target_id, slug=slug)
+
+        return my_profile, target_user
+
+    def state_response(self, message, my_profile, target_user, is_following):
+        return Response({
+            'message': message,
+            'data': {
+                'follower': my_profile.slug,
+                'following': target_user.slug,
+                'is_following': is_following,
+            }
+        })
+
     def post(self, request, slug):
-        my_profile= get_object_or_404(Profile, user=request.user)
-        target_user= get_object_or_404(Profile, slug= slug)
+        my_profile, target_user= self.get_profiles(request, slug)
 
         if target_user == my_profile:
             return Response({
                 'message': "You  can't follow your account"
             }, status=400)
 
-        follow_exists= Follow.objects.filter(
-            follower= my_profile,
-            following= target_user
-        ).first()
-
-        if follow_exists:
-            follow_exists.delete() #unfollow
+        if Follow.objects.unfollow(my_profile.pk, target_user.pk):
             return Response({
                 'message': 'Unfollow successfully'
             })
-        
-        follow= Follow.objects.create(
-            follower= my_profile,
-            following= target_user
-        )
+
+        Follow.objects.follow(my_profile.pk, target_user.pk)
+        follow= Follow.objects.get(follower= my_profile, following= target_user)
 
         return Response({
             'message': 'Followed Successfully',
             'data': FollowSerializer(follow).data
         })
-    
+
+    @extend_schema(
+        summary="Follow a user",
+        description="Idempotent follow. Following someone you already follow is a no-op and returns the same state.",
+        request=OpenApiTypes.NONE,
+        responses={
+            200: OpenApiResponse(
+                description="Final relationship state",
+                examples=[
+                    OpenApiExample(
+                        name="Follow Example",
+                        value={
+                            "message": "Followed Successfully",
+                            "data": {"follower": "nahidul", "following": "username", "is_following": True}
+                        },
+                    )
+                ]
+            ),
+            400: OpenApiResponse(description="Cannot follow yourself"),
+            404: OpenApiResponse(description="Target profile not found"),
+        }
+    )
+    def put(self, request, slug):
+        my_profile, target_user= self.get_profiles(request, slug)
+
+        if target_user == my_profile:
+            return Response({
+                'message': "You  can't follow your account"
+            }, status=400)
+
+        Follow.objects.follow(my_profile.pk, target_user.pk)
+        return self.state_response('Followed Successfully', my_profile, target_user, True)
+
+    @extend_schema(
+        summary="Unfollow a user",
+        description="Idempotent unfollow. Unfollowing someone you do not follow is a no-op and returns the same state.",
+        request=OpenApiTypes.NONE,
+        responses={
+            200: OpenApiResponse(
+                description="Final relationship state",
+                examples=[
+                    OpenApiExample(
+                        name="Unfollow Example",
+                        value={
+                            "message": "Unfollow successfully",
+                            "data": {"follower": "nahidul", "following": "username", "is_following": False}
+                        },
+                    )
+                ]
+            ),
+            404: OpenApiResponse(description="Target profile not found"),
+        }
+    )
+    def delete(self, request, slug):
+        my_profile, target_user= self.get_profiles(request, slug)
+
+        Follow.objects.unfollow(my_profile.pk, target_user.pk)
+        return self.state_response('Unfollow successfully', my_profile, target_user, False)
+
+
+@extend_schema(
+    summary="Follow or Unfollow many users",
+    description="Follow (or unfollow) up to `BULK_FOLLOW_MAX_SLUGS` profiles in one call. "
+                "Slugs are resolved with one query and written with one bulk statement. "
+                "Every slug gets its own result: followed, already_following, unfollowed, not_following, not_found or self.",
+    request=BulkFollowSerializer,
+    responses={
+        200: OpenApiResponse(
+            description="Per-slug results",
+            examples=[
+                OpenApiExample(
+                    name="Bulk Follow Example",
+                    value={
+                        "status": 200,
+                        "message": "Bulk follow done",
+                        "data": {"alice-smith": "followed", "bob-jones": "already_following", "nobody": "not_found"}
+                    },
+                )
+            ]
+        ),
+        400: OpenApiResponse(description="Validation error"),
+        404: OpenApiResponse(description="Own profile not found"),
+    },
+    examples=[
+        OpenApiExample(
+            "Bulk Follow Request",
+            value={"slugs": ["alice-smith", "bob-jones"], "action": "follow"},
+            request_only=True
+        )
+    ]
+)
+class BulkFollowView(APIView):
+    permission_classes= [IsAuthenticated]
+    authentication_classes= [ClaimsJWTAuthentication]
+
+    def post(self, request):
+        serializer= BulkFollowSerializer(data= request.data)
+        if not serializer.is_valid():
+            return Response({
+                'status': 400,
+                'message': 'invalid data',
+                'errors': serializer.errors
+            }, status=400)
+
+        slugs= list(dict.fromkeys(serializer.validated_data['slugs']))
+        action= serializer.validated_data['action']
+
+        my_profile= own_profile(request)
+        targets= dict(Profile.objects.filter(slug__in=slugs).values_list('slug', 'id'))
+
+        if action == 'follow':
+            changed= Follow.objects.bulk_follow(my_profile.pk, targets.values())
+            done, unchanged= 'followed', 'already_following'
+        else:
+            changed= Follow.objects.bulk_unfollow(my_profile.pk, targets.values())
+            done, unchanged= 'unfollowed', 'not_following'
+
+        results= {}
+        for slug in slugs:
+            if slug not in targets:
+                results[slug]= 'not_found'
+            elif targets[slug] == my_profile.pk:
+                results[slug]= 'self'
+            else:
+                results[slug]= done if targets[slug] in changed else unchanged
+
+        return Response({
+            'status': 200,
+            'message': f'Bulk {action} done',
+            'data': results
+        })
+
+
+@extend_schema(
+    summary="Relationship status for many profiles",
+    description="For each slug, whether you follow that profile and whether it follows you back. "
+                "Pass up to `RELATIONSHIP_MAX_SLUGS` comma separated slugs. Unknown slugs come back as null.",
+    parameters=[
+        OpenApiParameter("slugs", str, description="Comma separated profile slugs", required=True)
+    ],
+    responses={
+        200: OpenApiResponse(
+            description="Relationship per slug",
+            examples=[
+                OpenApiExample(
+                    name="Relationship Example",
+                    value={
+                        "status": 200,
+                        "data": {
+                            "alice-smith": {"following": True, "followed_by": False},
+                            "nobody": None
+                        }
+                    },
+                )
+            ]
+        ),
+        400: OpenApiResponse(description="Missing, invalid or too many slugs"),
+        404: OpenApiResponse(description="Own profile not found"),
+    }
+)
+class RelationshipStatusView(APIView):
+    permission_classes= [IsAuthenticated]
+    authentication_classes= [ClaimsJWTAuthentication]
+
+    def get(self, request):
+        slugs= [s for s in request.query_params.get('slugs', '').split(',') if s]
+        slugs= list(dict.fromkeys(slugs))
+        limit= settings.RELATIONSHIP_MAX_SLUGS
+
+        if not slugs or len(slugs) > limit:
+            return Response({
+                'status': 400,
+                'message': f'send between 1 and {limit} slugs'
+            }, status=400)
+
+        # Same rules as Profile.slug: the values end up in cache keys
+        max_length= Profile._meta.get_field('slug').max_length
+        invalid= [slug for slug in slugs if len(slug) > max_length or not slug_re.match(slug)]
+        if invalid:
+            return Response({
+                'status': 400,
+                'message': 'invalid slugs',
+                'data': invalid[:10]
+            }, status=400)
+
+        viewer_id= request.user.profile_id
+        if viewer_id is None:
+            return Response({
+                'status': 404,
+                'message': 'Profile not found'
+            }, status=404)
+
+        version, states= get_relationships(viewer_id, slugs)
+        missing= [slug for slug in slugs if slug not in states]
+
+        if missing:
+            rows= Profile.objects.filter(slug__in=missing).annotate(
+                is_following=Exists(Follow.objects.filter(follower_id=viewer_id, following_id=OuterRef('pk'))),
+                is_followed_by=Exists(Follow.objects.filter(follower_id=OuterRef('pk'), following_id=viewer_id)),
+            ).values_list('slug', 'is_following', 'is_followed_by')
+
+            fetched= {
+                slug: {'following': following, 'followed_by': followed_by}
+                for slug, following, followed_by in rows
+            }
+            set_relationships(viewer_id, version, fetched)
+            states.update(fetched)
+
+        return Response({
+            'status': 200,
+            'data': {slug: states.get(slug) for slug in slugs}
+        })
+
+
+@extend_schema(
+    summary="People you may know",
+    description="Profiles ranked by how many of the people you follow also follow them, "
+                "how many of your followers follow them, and whether they follow you. "
+                "Excludes you, profiles you already follow and private profiles. "
+                "Served from a periodically rebuilt snapshot of the follow graph.",
+    parameters=[
+        OpenApiParameter("limit", int, description="Number of suggestions (max 50)")
+    ],
+    responses={
+        200: OpenApiResponse(
+            description="Ranked suggestions",
+            examples=[
+                OpenApiExample(
+                    name="Suggestions Example",
+                    value={
+                        "status": 200,
+                        "data": [
+                            {"first_name": "Alice", "last_name": "Smith", "slug": "alice-smith", "score": 7}
+                        ]
+                    },
+                )
+            ]
+        ),
+        404: OpenApiResponse(description="Own profile not found"),
+    }
+)
+class SuggestionsView(APIView):
+    permission_classes= [IsAuthenticated]
+    authentication_classes= [ClaimsJWTAuthentication]
+
+    def get(self, request):
+        try:
+            limit= max(1, min(int(request.query_params.get('limit', 20)), 50))
+        except ValueError:
+            limit= 20
+
+        viewer_id= request.user.profile_id
+        if viewer_id is None:
+            return Response({
+                'status': 404,
+                'message': 'Profile not found'
+            }, status=404)
+
+        ranked= get_graph().suggest(viewer_id, limit=limit, max_fanout=settings.SUGGESTIONS_MAX_FANOUT)
+
+        # The snapshot may be a few minutes old, so privacy and follows are re-checked here
+        profiles= Profile.objects.filter(
+            ~Exists(Follow.objects.filter(follower_id=viewer_id, following_id=OuterRef('pk'))),
+            is_private=False,
+        ).only(*SimpleUserSerializer.Meta.fields).in_bulk(
+            [pk for pk, score in ranked]
+        )
+
+        data= []
+        for pk, score in ranked:
+            profile= profiles.get(pk)
+            if profile is None:
+                continue
+            row= SimpleUserSerializer(profile).data
+            row['score']= score
+            data.append(row)
+
+        return Response({
+            'status': 200,
+            'data': data
+        })
+
+
+@extend_schema(
+    summary="Search profiles",
+    description="Full-text search over first name, last name and bio. Every word is matched as a prefix, "
+                "so `jo smi` finds John Smith. Private profiles are never returned. "
+                "Results are ranked by relevance (default) or influence; follow `next` for more.",
+    parameters=[
+        OpenApiParameter("q", str, description="Search text", required=True),
+        OpenApiParameter("ordering", str, enum=['relevance', 'influence'], description="Result order"),
+        OpenApiParameter("fields", str, description="Comma separated subset of fields to return, e.g. `slug,first_name,last_name`"),
+        OpenApiParameter("cursor", str, description="Opaque page cursor"),
+        OpenApiParameter("page_size", int, description="Profiles per page"),
+    ],
+    responses=ProfileSerializer(many=True)
+)
+class ProfileSearchView(APIView):
+    permission_classes= [IsAuthenticated]
+    authentication_classes= [ClaimsJWTAuthentication]
+
+    def get(self, request):
+        query= request.query_params.get('q', '')
+        ordering= 'influence' if request.query_params.get('ordering') == 'influence' else 'relevance'
+        fields= ProfileSerializer.requested_fields(request)
+
+        paginator= KeysetPagination()
+        size= paginator.get_page_size(request)
+
+        if not search.available():
+            # Without FTS5 fall back to indexed-friendly prefix matches on the name columns
+            terms= query.split()
+            profiles= sparse_profiles(Profile.objects.filter(is_private=False), fields)
+            for term in terms:
+                profiles= profiles.filter(Q(first_name__istartswith=term) | Q(last_name__istartswith=term))
+            page= paginator.paginate_queryset(profiles if terms else Profile.objects.none(), request, view=self)
+            return paginator.get_paginated_response(ProfileSerializer(page, many=True, fields=fields).data)
+
+        after= None
+        cursor= request.query_params.get('cursor')
+        if cursor:
+            values, _= decode_cursor(cursor)
+            try:
+                after= (float(values[0]), int(values[1]))
+            except (IndexError, TypeError, ValueError):
+                raise NotFound('Invalid cursor')
+
+        hits= search.search(query, size + 1, after=after, ordering=ordering)
+        has_next= len(hits) > size
+        hits= hits[:size]
+
+        profiles= sparse_profiles(Profile.objects.all(), fields).in_bulk([pk for pk, score in hits])
+        data= ProfileSerializer([profiles[pk] for pk, score in hits if pk in profiles], many=True, fields=fields).data
+
+        next_link= None
+        if has_next:
+            next_link= replace_query_param(
+                request.build_absolute_uri(), 'cursor', encode_cursor([hits[-1][1], hits[-1][0]])
+            )
+
+        return Response({
+            'next': next_link,
+            'previous': None,
+            'results': data,
+        })
+
+
+@extend_schema(
+    summary="Autocomplete profile names",
+    description="Typeahead for mentions: profiles whose slug, first name or last name starts with `q`, "
+                "most followed first. Served from an in-memory prefix index, no database query.",
+    parameters=[
+        OpenApiParameter("q", str, description="Prefix typed so far", required=True),
+        OpenApiParameter("limit", int, description="Number of matches (max 20)"),
+    ],
+    responses=SimpleUserSerializer(many=True)
+)
+class ProfileAutocompleteView(APIView):
+    permission_classes= [IsAuthenticated]
+    authentication_classes= [ClaimsJWTAuthentication]
+
+    def get(self, request):
+        try:
+            limit= max(1, min(int(request.query_params.get('limit', 10)), 20))
+        except ValueError:
+            limit= 10
+
+        return Response(get_autocomplete_index().complete(request.query_params.get('q', ''), limit))
+
+
+@extend_schema(
+    summary="Export all profiles (staff only)",
+    description="Streams every profile as NDJSON (default) or CSV, optionally gzip compressed. "
+                "Rows are read in chunks and written as they are produced, so exports of any size "
+                "start immediately and use constant server memory.",
+    parameters=[
+        OpenApiParameter("output", str, enum=['ndjson', 'csv'], description="File format"),
+        OpenApiParameter("gzip", bool, description="Compress the file with gzip"),
+    ],
+    responses={
+        200: OpenApiResponse(description="Streamed file download"),
+        403: OpenApiResponse(description="Staff only"),
+    }
+)
+class ProfileExportView(APIView):
+    permission_classes= [IsAdminUser]
+    # is_staff comes from the user row, not from token claims
+    authentication_classes= [JWTAuthentication]
+
+    def get(self, request):
+        output= 'csv' if request.query_params.get('output') == 'csv' else 'ndjson'
+        compress= request.query_params.get('gzip') in ('1', 'true', 'yes')
+
+        filename= f'profiles.{output}'
+        content_type= 'text/csv' if output == 'csv' else 'application/x-ndjson'
+        if compress:
+            filename+= '.gz'
+            content_type= 'application/gzip'
+
+        response= StreamingHttpResponse(export_stream(output, compress), content_type=content_type)
+        response['Content-Disposition']= f'attachment; filename="{filename}"'
+        return response
+
 
 @extend_schema(
     summary="Get Followers of a User",
-    description="Retrieve a list of users who are following the given profile.",
+    description="Retrieve a list of users who are following the given profile, newest first. Follow the `next` / `previous` cursors to move between pages.",
     parameters=[
-        OpenApiParameter("slug", str, description="Profile slug of the target user", required=True)
+        OpenApiParameter("slug", str, description="Profile slug of the target user", required=True),
+        OpenApiParameter("cursor", str, description="Opaque page cursor"),
+        OpenApiParameter("page_size", int, description="Profiles per page"),
     ],
     responses=SimpleUserSerializer(many=True)
 )
 class FollowerList(APIView):
     permission_classes= [IsAuthenticated]
-    authentication_classes= [JWTAuthentication]
+    authentication_classes= [ClaimsJWTAuthentication]
     
+    @conditional(followers_validator)
     def get(self, request, slug):
-        profile= get_object_or_404(Profile, slug=slug)
+        profile_id= resolve_slug(slug)
+        if profile_id is None:
+            raise Http404
 
-        followers= Follow.objects.filter(following= profile).select_related('follower')
-        follower_profile= [f.follower for f in followers]
+        rows= follow_rows('follower')
+        followers= rows.values(Follow.objects.filter(following_id= profile_id), 'id', 'created_at')
+        paginator= KeysetPagination(ordering=('-created_at', '-id'))
+        page= paginator.paginate_queryset(followers, request, view=self)
 
-        serializer= SimpleUserSerializer(follower_profile, many= True)
-        return Response(serializer.data)
+        return paginator.get_paginated_response(rows.render(page))
 
 @extend_schema(
     summary="Get Following of a User",
-    description="Retrieve a list of users whom the given profile is following.",
+    description="Retrieve a list of users whom the given profile is following, newest first. Follow the `next` / `previous` cursors to move between pages.",
     parameters=[
-        OpenApiParameter("slug", str, description="Profile slug of the target user", required=True)
+        OpenApiParameter("slug", str, description="Profile slug of the target user", required=True),
+        OpenApiParameter("cursor", str, description="Opaque page cursor"),
+        OpenApiParameter("page_size", int, description="Profiles per page"),
     ],
     responses=SimpleUserSerializer(many=True)
 )
 class FollowingList(APIView):
     permission_classes= [IsAuthenticated]
-    authentication_classes= [JWTAuthentication]
+    authentication_classes= [ClaimsJWTAuthentication]
     
+    @conditional(following_validator)
     def get(self, request, slug):
-        profile= get_object_or_404(Profile, slug=slug)
+        profile_id= resolve_slug(slug)
+        if profile_id is None:
+            raise Http404
+
+        rows= follow_rows('following')
+        following= rows.values(Follow.objects.filter(follower_id= profile_id), 'id', 'created_at')
+        paginator= KeysetPagination(ordering=('-created_at', '-id'))
+        page= paginator.paginate_queryset(following, request, view=self)
+
+        return paginator.get_paginated_response(rows.render(page))
 
-        following= Follow.objects.filter(follower= profile).select_related('following')
 
-        following_profile= [f.following for f in following]
 
-        serializer= SimpleUserSerializer(following_profile, many=True)
 
-        return Response(serializer.data)
 
+""" personal data export """
+def _export_payload(request, export):
+    download_url= None
+    if export.status == DataExport.DONE:
+        download_url= request.build_absolute_uri(f'/api/me/export/{export.pk}/download/')
+
+    return {
+        'id': export.pk,
+        'status': export.status,
+        'created_at': export.created_at,
+        'finished_at': export.finished_at,
+        'download_url': download_url,
+    }
+
+
+@extend_schema(
+    summary="Export my data",
+    description="POST starts building a zip archive of your account, profile, profile image, followers and followings "
+                "in the background. GET returns the latest export; once `status` is `done` it carries a `download_url`. "
+                "An export not finished within the timeout is marked `failed` and a new one can be started.",
+    request=OpenApiTypes.NONE,
+    responses={
+        200: OpenApiResponse(description="Latest export status"),
+        202: OpenApiResponse(description="Export queued"),
+        404: OpenApiResponse(description="No export requested yet"),
+    }
+)
+class DataExportView(APIView):
+    permission_classes= [IsAuthenticated]
+    authentication_classes= [ClaimsJWTAuthentication]
+
+    def get(self, request):
+        expire_stale(DataExport.objects.filter(user_id=request.user.id))
+        export= DataExport.objects.filter(user_id=request.user.id).order_by('-created_at', '-id').first()
+        if export is None:
+            return Response({
+                'status': 404,
+                'message': 'No export requested yet'
+            }, status=404)
+
+        return Response({
+            'status': 200,
+            'data': _export_payload(request, export)
+        })
+
+    def post(self, request):
+        expire_stale(DataExport.objects.filter(user_id=request.user.id))
+        export= DataExport.objects.filter(
+            user_id=request.user.id, status__in=[DataExport.PENDING, DataExport.RUNNING]
+        ).first()
+
+        if export is None:
+            export= DataExport.objects.create(user_id=request.user.id)
+            start_export(export)
+
+        return Response({
+            'status': 202,
+            'message': 'Your export is being prepared',
+            'data': _export_payload(request, export)
+        }, status=202)
+
+
+@extend_schema(
+    summary="Download my data export",
+    description="Streams a finished export archive. Only the owner can download it.",
+    responses={
+        200: OpenApiResponse(description="Zip archive"),
+        404: OpenApiResponse(description="Export not found or not finished"),
+    }
+)
+class DataExportDownloadView(APIView):
+    permission_classes= [IsAuthenticated]
+    authentication_classes= [ClaimsJWTAuthentication]
 
+    def get(self, request, pk):
+        export= get_object_or_404(DataExport, pk=pk, user_id=request.user.id, status=DataExport.DONE)
 
+        return FileResponse(export.archive.open('rb'), as_attachment=True, filename='my-data.zip')
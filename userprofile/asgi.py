@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'userprofile.settings')
 
 application = get_asgi_application()
+
+# Build the "people you may know" graph and the typeahead index now rather
+# than in the first request
+from profiles.graph import warm as warm_follow_graph  # noqa: E402
+from profiles.autocomplete import warm as warm_autocomplete  # noqa: E402
+
+warm_follow_graph()
+warm_autocomplete()
@@ -0,0 +1,41 @@
+import logging
+import threading
+
+from django.db import close_old_connections, connections
+
+
+logger= logging.getLogger(__name__)
+
+
+class BackgroundTask:
+    """
+    Runs `target` in a daemon thread, at most one run at a time. Used to
+    rebuild in-memory snapshots (follow graph, typeahead index, revocation
+    filter) while the stale copy keeps serving requests.
+    """
+
+    def __init__(self, name, target):
+        self.name= name
+        self.target= target
+        self.running= False
+        self._lock= threading.Lock()
+
+    def start(self):
+        """Start a run unless one is in progress. Returns whether it started."""
+        with self._lock:
+            if self.running:
+                return False
+            self.running= True
+
+        threading.Thread(target=self._run, name=self.name, daemon=True).start()
+        return True
+
+    def _run(self):
+        try:
+            close_old_connections()
+            self.target()
+        except Exception:
+            logger.exception("%s failed", self.name)
+        finally:
+            self.running= False
+            connections.close_all()
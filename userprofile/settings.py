@@ -61,7 +61,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'profiles.middleware.UpdateLastSeenMiddleware',
     'profiles.middleware.LastActiveMiddleware',
 ]
 
@@ -89,6 +88,18 @@ TEMPLATES = [
 WSGI_APPLICATION = 'userprofile.wsgi.application'
 
 
+# Cache
+# Local memory by default; point CACHE_BACKEND / CACHE_LOCATION at a shared
+# backend (e.g. django.core.cache.backends.redis.RedisCache) in production.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'social-media-api'),
+    }
+}
+
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -103,6 +114,31 @@ DATABASES = {
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# Password hashing. The first hasher hashes new passwords; the rest only
+# verify older hashes, which are upgraded at the user's next login. Changing
+# PASSWORD_PBKDF2_ITERATIONS re-hashes PBKDF2 passwords the same way.
+PASSWORD_PBKDF2_ITERATIONS= int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 1_000_000))
+PASSWORD_HASHERS= [
+    os.getenv('PASSWORD_HASHER', 'accounts.hashers.ConfiguredPBKDF2PasswordHasher'),
+    'accounts.hashers.ConfiguredPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_HASHERS= list(dict.fromkeys(PASSWORD_HASHERS))
+
+# ClaimsJWTAuthentication: validated access tokens kept per process
+AUTH_TOKEN_CACHE_SIZE= int(os.getenv('AUTH_TOKEN_CACHE_SIZE', 4096))
+
+# Refresh token revocation (accounts.revocation): per-process Bloom filter of
+# revoked JTIs, synced with the RevokedToken table every REVOCATION_SYNC_SECONDS
+# and rebuilt (dropping expired tokens) every REVOCATION_REBUILD_SECONDS
+REVOCATION_FILTER_CAPACITY= int(os.getenv('REVOCATION_FILTER_CAPACITY', 100000))
+REVOCATION_FILTER_ERROR_RATE= float(os.getenv('REVOCATION_FILTER_ERROR_RATE', 0.001))
+REVOCATION_SYNC_SECONDS= int(os.getenv('REVOCATION_SYNC_SECONDS', 5))
+REVOCATION_REBUILD_SECONDS= int(os.getenv('REVOCATION_REBUILD_SECONDS', 3600))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -144,19 +180,57 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 # email send
-EMAIL_BACKEND= 'django.core.mail.backends.smtp.EmailBackend'
+# `django.core.mail.backends.filebased.EmailBackend` (with EMAIL_FILE_PATH) or
+# the console backend work for local runs and tests
+EMAIL_BACKEND= os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH= os.getenv('EMAIL_FILE_PATH', BASE_DIR / 'sent_emails')
 EMAIL_HOST= 'smtp.gmail.com'
 EMAIL_USE_TLS= True
 EMAIL_PORT= 587
 EMAIL_HOST_USER= os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD= os.getenv('EMAIL_HOST_PASSWORD')
 
+# Outbound mail queue (accounts.mailqueue). Web processes run MAIL_WORKERS
+# threads unless MAIL_QUEUE_IN_PROCESS=0, e.g. when `run_mail_worker` runs
+# as its own process.
+MAIL_QUEUE_IN_PROCESS= os.getenv('MAIL_QUEUE_IN_PROCESS', '1') == '1'
+MAIL_WORKERS= int(os.getenv('MAIL_WORKERS', 2))
+MAIL_BATCH_SIZE= int(os.getenv('MAIL_BATCH_SIZE', 50))
+MAIL_MAX_ATTEMPTS= int(os.getenv('MAIL_MAX_ATTEMPTS', 5))
+MAIL_RETRY_BASE_SECONDS= int(os.getenv('MAIL_RETRY_BASE_SECONDS', 30))
+MAIL_CLAIM_TIMEOUT_SECONDS= int(os.getenv('MAIL_CLAIM_TIMEOUT_SECONDS', 300))
+MAIL_POLL_SECONDS= int(os.getenv('MAIL_POLL_SECONDS', 30))
+
 
 # MEDIA FILE 
 MEDIA_URL= '/media/'
 MEDIA_ROOT= BASE_DIR / 'media'
 
-
+# Background threads building personal data export archives
+DATA_EXPORT_WORKERS= int(os.getenv('DATA_EXPORT_WORKERS', 1))
+# Pending/running exports older than this are marked failed (e.g. lost in a restart) so a new one can start
+DATA_EXPORT_TIMEOUT_SECONDS= int(os.getenv('DATA_EXPORT_TIMEOUT_SECONDS', 3600))
+
+
+
+# Token buckets for the account endpoints (accounts.throttling): N/period is a
+# burst of N that refills evenly over the period. Each rate can be overridden
+# with THROTTLE_<SCOPE>, e.g. THROTTLE_LOGIN_IP=50/min; THROTTLE_CACHE names
+# the cache holding the buckets and should be shared between workers.
+THROTTLE_CACHE= os.getenv('THROTTLE_CACHE', 'default')
+AUTH_THROTTLE_RATES= {
+    scope: os.getenv(f'THROTTLE_{scope.upper()}', rate)
+    for scope, rate in {
+        'register_ip': '20/hour',
+        'register_email': '5/hour',
+        'login_ip': '30/min',
+        'login_email': '10/min',
+        'verify_ip': '30/min',
+        'verify_email': '5/min',
+        'refresh_ip': '60/min',
+        'revoke_ip': '60/min',
+    }.items()
+}
 
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
@@ -165,12 +239,48 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    'DEFAULT_THROTTLE_RATES': AUTH_THROTTLE_RATES,
+    # Reverse proxies in front of the app whose X-Forwarded-For is trusted;
+    # 0 keys throttles on REMOTE_ADDR
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 
 }
 
+# Keyset pagination for profile lists
+PROFILE_PAGE_SIZE= int(os.getenv('PROFILE_PAGE_SIZE', 20))
+PROFILE_MAX_PAGE_SIZE= int(os.getenv('PROFILE_MAX_PAGE_SIZE', 100))
+
+# Largest slug list accepted by the bulk follow endpoint
+BULK_FOLLOW_MAX_SLUGS= int(os.getenv('BULK_FOLLOW_MAX_SLUGS', 100))
+
+# Batch relationship lookup
+RELATIONSHIP_MAX_SLUGS= int(os.getenv('RELATIONSHIP_MAX_SLUGS', 300))
+RELATIONSHIP_CACHE_SECONDS= int(os.getenv('RELATIONSHIP_CACHE_SECONDS', 30))
+
+# Read-through cache for profile pages and slug lookups. Entries are versioned
+# per profile and writes bump the version, but the bump only reaches processes
+# sharing the cache: with the default locmem backend other workers keep serving
+# their copy until it expires. Run more than one worker only with a shared
+# CACHE_BACKEND (Redis, Memcached).
+PROFILE_CACHE_SECONDS= int(os.getenv('PROFILE_CACHE_SECONDS', 300))
+PROFILE_CACHE_LOCK_SECONDS= int(os.getenv('PROFILE_CACHE_LOCK_SECONDS', 5))
+
+# "People you may know": how often the in-memory follow graph is rebuilt and
+# how many neighbours per hop are looked at
+SUGGESTIONS_REFRESH_SECONDS= int(os.getenv('SUGGESTIONS_REFRESH_SECONDS', 300))
+SUGGESTIONS_MAX_FANOUT= int(os.getenv('SUGGESTIONS_MAX_FANOUT', 1000))
+
+# Typeahead index: full rebuild interval (signals keep it current in between)
+AUTOCOMPLETE_REFRESH_SECONDS= int(os.getenv('AUTOCOMPLETE_REFRESH_SECONDS', 600))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Social Media API",
     "DESCRIPTION": "Follow, Profile, User API Documentation",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
-}
\ No newline at end of file
+}
+
+# Presence (last_active_at) write-behind buffer
+PRESENCE_WINDOW_SECONDS= int(os.getenv('PRESENCE_WINDOW_SECONDS', 60))
+PRESENCE_FLUSH_INTERVAL= int(os.getenv('PRESENCE_FLUSH_INTERVAL', 10))
+PRESENCE_MAX_PENDING= int(os.getenv('PRESENCE_MAX_PENDING', 500))